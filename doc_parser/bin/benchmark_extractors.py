@@ -0,0 +1,110 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+from pypdf import PdfReader
+
+# noinspection PyUnresolvedReferences
+import find_lib
+from config.system_config import SystemConfig
+from manual_parser.main_parser import MainParser
+from manual_parser.toc_parser import TocParser
+from util.format_util import headline
+from util.text_extractor import (EstimatedLayoutTextExtractor, LayoutTextExtractor, PlainTextExtractor,
+                                 TextExtractor)
+
+log = logging.getLogger(__name__)
+
+
+def extract(extractor: TextExtractor, page_indexes: list[int]) -> tuple[dict[int, str], float]:
+    """
+    Extract the pages with a new PdfReader, so no extractor benefits from objects cached by a previous one.
+
+    :param extractor: Text extractor to measure
+    :param page_indexes: Indexes of the pages to extract
+    :return: Tuple of the extracted text per page index and the extraction time in seconds
+    """
+    reader = PdfReader(SystemConfig().pdf_file)
+    start = time.perf_counter()
+    contents = {index: extractor.extract(reader.pages[index]) for index in page_indexes}
+    return contents, time.perf_counter() - start
+
+
+def toc_entries(contents: dict[int, str]) -> list[tuple[str, str]]:
+    """
+    Parse the headlines and categories like the TocParser does.
+
+    :param contents: Extracted text of the pages of the table of contents
+    :return: List of tuples with headline or category and its page number
+    """
+    entries: list[tuple[str, str]] = []
+    for content in contents.values():
+        for line in content.splitlines():
+            line = line.strip()
+            if m := TocParser.TOC_HEADLINE_PATTERN.match(line) or TocParser.TOC_CATEGORY_PATTERN.match(line):
+                entries.append((" ".join(m.group(1).split()), m.group(2)))
+    return entries
+
+
+if __name__ == "__main__":
+    extractor_names = [LayoutTextExtractor.NAME, EstimatedLayoutTextExtractor.NAME, PlainTextExtractor.NAME]
+    parser = argparse.ArgumentParser(description="Compare the text extractors for a *.pdf Kontakt KSP manual")
+    parser.add_argument('-c', '--config-file', required=True, help="Path to the *.ini configuration file")
+    parser.add_argument('-e', '--extractors', default=",".join(extractor_names),
+                        help=f"Text extractors to compare, where the first one is the reference "
+                             f"(default: {','.join(extractor_names)})")
+    parser.add_argument('--pages', default="",
+                        help="Only extract these pages (and the table of contents), e.g. \"12-20,35\"")
+    args = parser.parse_args()
+    ini_file = Path(args.config_file).resolve()
+    if not ini_file.is_file():
+        print(f"*** Error: Can't find configuration file {ini_file}")
+        sys.exit(-1)
+    config = SystemConfig(ini_file)
+    headline("Benchmark text extractors")
+    pdf_reader = PdfReader(SystemConfig().pdf_file)
+    if args.pages:
+        indexes, _ = MainParser.select_pages(pdf_reader, args.pages, "")
+    else:
+        indexes = list(range(len(pdf_reader.pages)))
+    toc_indexes = [index for index in indexes if index < SystemConfig().page_offset]
+    body_indexes = [index for index in indexes if index >= SystemConfig().page_offset]
+    reference_toc: list[tuple[str, str]] = []
+    reference_words: dict[int, list[str]] = {}
+    for cnt, name in enumerate(args.extractors.split(",")):
+        extractor = TextExtractor.create(name.strip())
+        toc_contents, toc_time = extract(extractor, toc_indexes)
+        body_contents, body_time = extract(extractor, body_indexes)
+        entries = toc_entries(toc_contents)
+        # The text is equivalent for the parser if it contains the same words in the same order
+        words = {index: content.split() for index, content in body_contents.items()}
+        if cnt == 0:
+            reference_toc = entries
+            reference_words = words
+        same_pages = sum(1 for index in body_indexes if words[index] == reference_words[index])
+        log.info(f"{extractor.NAME}:")
+        log.info(f"- Table of contents: {len(toc_indexes)} pages in {toc_time:.2f} s, {len(entries)} entries, "
+                 f"{'same' if entries == reference_toc else 'different'} entries compared to the reference")
+        pages_per_sec = len(body_indexes) / body_time if body_time else 0
+        log.info(f"- Other pages: {len(body_indexes)} pages in {body_time:.2f} s ({pages_per_sec:.1f} pages/s), "
+                 f"{same_pages} pages with the same words as the reference")
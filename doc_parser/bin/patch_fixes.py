@@ -0,0 +1,57 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+import argparse
+import sys
+from pathlib import Path
+
+# noinspection PyUnresolvedReferences
+import find_lib
+from config.system_config import SystemConfig
+from manual_parser.main_parser import MainParser
+from util.format_util import headline
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store the manual fixes of the text file of a Kontakt KSP manual as "
+                                                 "patch set or replay a patch set")
+    parser.add_argument('-c', '--config-file', required=True, help="Path to the *.ini configuration file")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--create', action='store_true',
+                       help="Store the differences between the original and the fixed text file in the patch_set_file")
+    group.add_argument('--apply', type=Path,
+                       help="Replay this patch set (e.g. the patch_set_file of the previous release) on the original "
+                            "text file and write the fixed text file")
+    parser.add_argument('-f', '--force', action='store_true', help="Overwrite a fixed text file which contains fixes")
+    args = parser.parse_args()
+    ini_file = Path(args.config_file).resolve()
+    if not ini_file.is_file():
+        print(f"*** Error: Can't find configuration file {ini_file}")
+        sys.exit(-1)
+    config = SystemConfig(ini_file)
+    if args.create:
+        headline("Create patch set")
+        MainParser.create_patch_set()
+    else:
+        headline("Apply patch set")
+        fixed_file = SystemConfig().txt_file_fixed
+        if fixed_file.is_file() and not args.force and \
+                fixed_file.read_bytes() != SystemConfig().txt_file_original.read_bytes():
+            print(f"*** Error: {fixed_file} already contains fixes => Use --force to overwrite it")
+            sys.exit(-1)
+        MainParser.apply_patch_set(args.apply)
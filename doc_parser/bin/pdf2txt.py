@@ -17,6 +17,7 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 ##############################################################################
 import argparse
+import os
 import sys
 from pathlib import Path
 
@@ -27,13 +28,37 @@ from manual_parser.main_parser import MainParser
 from util.format_util import headline
 
 
-parser = argparse.ArgumentParser(description="Convert a *.pdf Kontakt KSP manual to *.txt")
-parser.add_argument('-c', '--config-file', required=True, help="Path to the *.ini configuration file")
-args = parser.parse_args()
-ini_file = Path(args.config_file).resolve()
-if not ini_file.is_file():
-    print(f"*** Error: Can't find configuration file {ini_file}")
-    sys.exit(-1)
-config = SystemConfig(ini_file)
-headline("Convert *.pdf to *.txt")
-MainParser.convert_to_text()
+if __name__ == "__main__":
+    # The guard is needed, because the worker processes for --jobs might import this module
+    parser = argparse.ArgumentParser(description="Convert a *.pdf Kontakt KSP manual to *.txt")
+    parser.add_argument('-c', '--config-file', required=True, help="Path to the *.ini configuration file")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Number of worker processes to extract the pages (default: 1, 0 for the number of CPUs)")
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help="Extract all pages without using the page cache")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Take the pages unchanged since the previous conversion from the page cache and report the "
+                             "changed pages")
+    parser.add_argument('--pages', default="",
+                        help="Only convert these pages (and the table of contents), e.g. \"12-20,35\"")
+    parser.add_argument('--chapters', default="",
+                        help="Only convert the pages of these chapters (and the table of contents), e.g. \"5-7\"")
+    parser.add_argument('-o', '--output', type=Path,
+                        help="Text file for --pages and --chapters (default: original text file with suffix _Partial)")
+    parser.add_argument('--recycle-pages', dest='recycle_pages', type=int, default=0,
+                        help="Open a new PdfReader every n pages to keep the memory usage low (default: 0 for never)")
+    parser.add_argument('--summary-file', dest='summary_file', type=Path,
+                        help="Write a JSON summary of the conversion (pages/s, slowest pages, bytes written, ...)")
+    parser.add_argument('--apply-fixes', dest='patch_set_file', type=Path,
+                        help="Create the fixed text file (if it doesn't exist) by replaying this patch set, e.g. the "
+                             "patch_set_file of the previous release")
+    args = parser.parse_args()
+    ini_file = Path(args.config_file).resolve()
+    if not ini_file.is_file():
+        print(f"*** Error: Can't find configuration file {ini_file}")
+        sys.exit(-1)
+    config = SystemConfig(ini_file)
+    headline("Convert *.pdf to *.txt")
+    MainParser.convert_to_text(args.jobs or os.cpu_count() or 1, args.use_cache, args.incremental, args.pages,
+                               args.chapters, args.output, args.recycle_pages, args.summary_file,
+                               args.patch_set_file)
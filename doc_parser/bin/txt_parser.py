@@ -17,6 +17,7 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 ##############################################################################
 import argparse
+import os
 import sys
 from pathlib import Path
 
@@ -28,14 +29,18 @@ from config.constants import ItemType
 from util.format_util import headline
 
 
-parser = argparse.ArgumentParser(description="Parse the text file of a Kontakt KSP manual which was converted from *.pdf to *.txt")
-parser.add_argument('-c', '--config-file', required=True, help="Path to the *.ini configuration file")
-args = parser.parse_args()
-ini_file = Path(args.config_file).resolve()
-if not ini_file.is_file():
-    print(f"*** Error: Can't find configuration file {ini_file}")
-    sys.exit(-1)
-config = SystemConfig(ini_file)
-headline("Loading Main Parser")
-main_parser = MainParser.get_parser(ItemType.MAIN)
-main_parser.parse()
+if __name__ == "__main__":
+    # The guard is needed, because the worker processes for --jobs might import this module
+    parser = argparse.ArgumentParser(description="Parse the text file of a Kontakt KSP manual which was converted from *.pdf to *.txt")
+    parser.add_argument('-c', '--config-file', required=True, help="Path to the *.ini configuration file")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Number of worker processes to parse the phases (default: 1, 0 for the number of CPUs)")
+    args = parser.parse_args()
+    ini_file = Path(args.config_file).resolve()
+    if not ini_file.is_file():
+        print(f"*** Error: Can't find configuration file {ini_file}")
+        sys.exit(-1)
+    config = SystemConfig(ini_file)
+    headline("Loading Main Parser")
+    main_parser = MainParser.get_parser(ItemType.MAIN)
+    main_parser.parse(args.jobs or os.cpu_count() or 1)
@@ -24,7 +24,7 @@ from pathlib import Path
 from typing import Optional, TYPE_CHECKING
 
 from config.constants import ItemType
-from manual_parser.content_pattern import ContentPattern
+from manual_parser.content_pattern import ContentPattern, ContentPatterns
 from util.rewind_reader import RewindReader
 
 if TYPE_CHECKING:
@@ -49,11 +49,12 @@ class SystemConfig(metaclass=Singleton):
     CONTENT_START_STOP_PATTERN = re.compile(r"^\s*(.+?)\s*==>\s*(.+)\s*")
     """Pattern to get the content start and stop patterns from the *.ini file"""
 
-    def __init__(self, ini_file: Path = None):
+    def __init__(self, ini_file: Path = None, init_logging: bool = True):
         """
         Read the system configuration data from the specified *.ini file.
 
         :param ini_file: Path to the *.ini file to read
+        :param init_logging: If False then the logging is not initialized, e.g. in worker processes
         """
         self.ini_file: Path = ini_file
         self.ini_dir = ini_file.parent
@@ -71,24 +72,31 @@ class SystemConfig(metaclass=Singleton):
         self.log_format_file: str = self.settings["log_format_file"]
         self.log_date_format_console: str = self.settings["log_date_format_console"]
         self.log_date_format_file: str = self.settings["log_date_format_file"]
-        self.initialize_logging()
+        if init_logging:
+            self.initialize_logging()
         # PDF Converter Settings
         self.pdf_file: Path = self._get_file("pdf_file")
         self.txt_file_original: Path = self._get_file("txt_file_original")
         self.txt_file_fixed: Path = self._get_file("txt_file_fixed")
+        self.page_cache_file: Optional[Path] = self._get_optional_file("page_cache_file")
+        self.changed_pages_file: Optional[Path] = self._get_optional_file("changed_pages_file")
+        self.patch_set_file: Optional[Path] = self._get_optional_file("patch_set_file")
+        self.patch_rejects_file: Optional[Path] = self._get_optional_file("patch_rejects_file")
+        self.text_extractor: str = self.settings.get("text_extractor", "layout")
+        self.toc_text_extractor: str = self.settings.get("toc_text_extractor", self.text_extractor)
         # Parser Settings
         self.page_offset: int = self._get_int("page_offset")
         self.page_header_lines: int = self._get_int("page_header_lines")
         self.csv_dir: Path = self._get_dir("csv_dir")
-        self.callbacks_content_patterns: list[ContentPattern] = self._get_content_patterns("callbacks_content_patterns")
+        self.callbacks_content_patterns: ContentPatterns = self._get_content_patterns("callbacks_content_patterns")
         self.callbacks_csv: Path = self._get_file("callbacks_csv")
-        self.widgets_content_patterns: list[ContentPattern] = self._get_content_patterns("widgets_content_patterns")
+        self.widgets_content_patterns: ContentPatterns = self._get_content_patterns("widgets_content_patterns")
         self.widgets_csv: Path = self._get_file("widgets_csv")
-        self.functions_content_patterns: list[ContentPattern] = self._get_content_patterns("functions_content_patterns")
+        self.functions_content_patterns: ContentPatterns = self._get_content_patterns("functions_content_patterns")
         self.functions_csv: Path = self._get_file("functions_csv")
-        self.commands_content_patterns: list[ContentPattern] = self._get_content_patterns("commands_content_patterns")
+        self.commands_content_patterns: ContentPatterns = self._get_content_patterns("commands_content_patterns")
         self.commands_csv: Path = self._get_file("commands_csv")
-        self.variables_content_patterns: list[ContentPattern] = self._get_content_patterns("variables_content_patterns")
+        self.variables_content_patterns: ContentPatterns = self._get_content_patterns("variables_content_patterns")
         self.variables_csv: Path = self._get_file("variables_csv")
         self.delimiter: str = self.settings["delimiter"]
         self.dump: bool = self._get_bool("dump")
@@ -138,6 +146,17 @@ class SystemConfig(metaclass=Singleton):
         """
         return self._get_dir(name)
 
+    def _get_optional_file(self, name: str) -> Optional[Path]:
+        """
+        Get the path of the optional file read from the *.ini file.
+
+        :param name: Name of the setting in the *.ini file
+        :return: Path of the file or None if the setting is missing or empty
+        """
+        if not self.settings.get(name, "").strip():
+            return None
+        return self._get_file(name)
+
     def _get_int(self, name: str) -> int:
         """
         Convert the string number to an integer read from the *.ini file.
@@ -175,12 +194,13 @@ class SystemConfig(metaclass=Singleton):
                     log.warning(f"Phase {item_type.value} will allways be called and needs not to be specified")
         return phases
 
-    def _get_content_patterns(self, name: str) -> list[ContentPattern]:
+    def _get_content_patterns(self, name: str) -> ContentPatterns:
         """
         Get the list of content start and end patterns.
 
         :param name: Name of the setting in the *.ini file
-        :return: List of ContentPattern objects for each section to be parsed
+        :return: ContentPatterns with a ContentPattern object for each section to be parsed and the combined start
+            pattern
         """
         content_pattern_list: list[ContentPattern] = []
         for line in self.settings[name].splitlines():
@@ -192,7 +212,7 @@ class SystemConfig(metaclass=Singleton):
                     content_pattern_list.append(content_pattern)
                 else:
                     log.error(f"Can't parse start and stop pattern: {line}")
-        return content_pattern_list
+        return ContentPatterns(content_pattern_list)
 
     def _get_log_level(self, name: str) -> int:
         """
@@ -43,8 +43,8 @@ class CallbackParser(ItemParser):
             SystemConfig().callbacks_csv
         )
 
-    def scan_items(self):
-        super().scan_items()
+    def finish_scan(self):
+        super().finish_scan()
         # Special handling for on rpn/on nrpn
         # Copy the documentation from on nrpn to on rpn
         nrpn_doc_item = self.all_items["nrpn"][0]
@@ -68,15 +68,11 @@ class CallbackParser(ItemParser):
             is_category = True
         elif line in self.chapter_categories:
             # Check if the next line (after an empty line) starts with the same category
-            # Remember the current position
-            cur_pos = self.reader.handle.tell()
-            # Read the next line which should be empty
-            self.reader.readline()
-            # Read the next line which should start with the category
-            next_line = self.reader.readline()
+            # The next line should be empty and the line after should start with the category
+            next_lines = self.reader.peek(2)
+            next_line = next_lines[1] if len(next_lines) > 1 else ""
             if next_line.startswith(line):
                 is_category = True
-            self.reader.handle.seek(cur_pos)
         return is_category
 
     def check_item(self, line) -> Optional[DocState]:
@@ -43,8 +43,8 @@ class CommandParser(ItemParser):
             SystemConfig().commands_csv
         )
 
-    def parse(self):
-        super().parse()
+    def finish(self):
+        super().finish()
         # Special handling for set_rpn()/set_nrpn()
         # Copy the documentation from set_nrpn() to set_rpn()
         set_nrpn_doc_item = self.all_items["set_nrpn"][0]
@@ -67,12 +67,9 @@ class CommandParser(ItemParser):
             is_category = True
         elif line in self.chapter_categories:
             # Check if the next line (after an empty line) starts with the same category
-            # Remember the current position
-            cur_pos = self.reader.handle.tell()
-            # Read the next line which should be empty
-            self.reader.readline()
-            # Read the next line which should start with the category
-            next_line = self.reader.readline()
+            # The next line should be empty and the line after should start with the category
+            next_lines = self.reader.peek(2)
+            next_line = next_lines[1] if len(next_lines) > 1 else ""
             # Special handling for set_rpn()/set_nrpn()
             if line == "set_rpn()/set_nrpn()":
                 is_category = True
@@ -80,7 +77,6 @@ class CommandParser(ItemParser):
                 line = line[:-1]
             if next_line.startswith(line):
                 is_category = True
-            self.reader.handle.seek(cur_pos)
         return is_category
 
     def check_item(self, line) -> Optional[DocState]:
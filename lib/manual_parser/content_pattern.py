@@ -16,8 +16,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 ##############################################################################
+import re
 from re import Pattern, Match
-from typing import Optional
+from typing import Optional, Iterator
 
 
 class ContentPattern:
@@ -50,3 +51,58 @@ class ContentPattern:
         :return: Match object or None if the line does not match the stop pattern
         """
         return self.stop_pattern.match(line)
+
+
+class ContentPatterns:
+    GROUP_PREFIX = "content_start_"
+    """Prefix for the named group of each start pattern in the combined start pattern"""
+
+    def __init__(self, content_patterns: list[ContentPattern]):
+        """
+        Container for all ContentPattern objects of a phase. The start patterns are combined to a single pattern
+        where each start pattern is an alternative in a named group, so a single match per line finds out which
+        content starts.
+
+        :param content_patterns: List of ContentPattern objects in the order in which they are checked
+        """
+        self.content_patterns: list[ContentPattern] = content_patterns
+        """List of ContentPattern objects in the order in which they are checked"""
+        self.start_pattern: Optional[Pattern] = None
+        """Combined start pattern or None if there are no content patterns or they can't be combined"""
+        if content_patterns:
+            alternatives = [f"(?P<{ContentPatterns.GROUP_PREFIX}{i}>{content_pattern.start_pattern.pattern})"
+                            for i, content_pattern in enumerate(content_patterns)]
+            try:
+                self.start_pattern = re.compile("|".join(alternatives))
+            except re.error:
+                # E.g. global flags or the same group name in different start patterns
+                self.start_pattern = None
+
+    def __iter__(self) -> Iterator[ContentPattern]:
+        """
+        :return: Iterator over the ContentPattern objects
+        """
+        return iter(self.content_patterns)
+
+    def __len__(self) -> int:
+        """
+        :return: Number of ContentPattern objects
+        """
+        return len(self.content_patterns)
+
+    def start(self, line: str) -> Optional[ContentPattern]:
+        """
+        Check if the passed line matches any start pattern.
+
+        :param line: Line to check
+        :return: First ContentPattern whose start pattern matches or None if the line does not match any start pattern
+        """
+        if self.start_pattern:
+            if m := self.start_pattern.match(line):
+                # The named group of the start pattern is closed last, so it is the last matched group
+                return self.content_patterns[int(m.lastgroup.removeprefix(ContentPatterns.GROUP_PREFIX))]
+            return None
+        for content_pattern in self.content_patterns:
+            if content_pattern.start(line):
+                return content_pattern
+        return None
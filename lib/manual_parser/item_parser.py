@@ -25,7 +25,7 @@ from abc import abstractmethod
 from typing import Optional, Callable
 
 from doc_item.doc_item import DocItem
-from manual_parser.content_pattern import ContentPattern
+from manual_parser.content_pattern import ContentPattern, ContentPatterns
 from manual_parser.toc_parser import TocParser
 from config.constants import DocState
 from config.system_config import SystemConfig
@@ -46,7 +46,7 @@ class ItemParser:
     def __init__(
             self,
             doc_item_class: type[DocItem],
-            content_patterns: list[ContentPattern],
+            content_patterns: ContentPatterns,
             csv_file: Path,
             on_headline: Callable[[str], None] = None,
             on_category: Callable[[str], None] = None,
@@ -56,7 +56,7 @@ class ItemParser:
         Base parser for documentation items in the Kontakt KSP text manual.
 
         :param doc_item_class: Class of the items to be parsed, e.g. CallbackItem
-        :param content_patterns: List of ContentPattern objects, where each object contains the start and stop patterns
+        :param content_patterns: ContentPattern objects, where each object contains the start and stop patterns
         :param csv_file: Path of the *.csv export file
         :param on_headline: Callback for each new headline e.g. for initialization
         :param on_category: Callback for each new category e.g. for initialization
@@ -64,8 +64,8 @@ class ItemParser:
         """
         self.doc_item_class: type[DocItem] = doc_item_class
         """Class of the items to be parsed, e.g. CallbackItem"""
-        self.content_patterns: list[ContentPattern] = content_patterns
-        """List of ContentPattern objects, where each object contains the start and stop patterns"""
+        self.content_patterns: ContentPatterns = content_patterns
+        """ContentPattern objects, where each object contains the start and stop patterns"""
         self.csv_file: Path = csv_file
         """Path of the *.csv export file"""
         self.on_headline: Callable[[str], None] = on_headline
@@ -106,39 +106,134 @@ class ItemParser:
         """Object containing the table of contents (TOC)"""
         self.content_pattern: Optional[ContentPattern] = None
         """Current content pattern (if any)"""
+        self.content_start_pages: set[int] = set()
+        """Page numbers where the content has been started"""
 
     def parse(self):
         """
-        Parse the text file for widgets.
+        Parse the text file for items. If the pages of all content starts are known from the table of contents, then
+        only the content is parsed beginning at these pages. Otherwise, the whole text file is parsed.
         """
-        log_step(f"Parse {self.doc_item_class.plural()} in {self.reader.file}")
+        self.start()
         self.reader.reset()
-        while self.search_content_start():
-            self.scan_items()
+        if not ItemParser.parse_content_pages([self]):
+            self.start()
+            self.reader.reset()
+            for line in self.reader:
+                self.parse_line(line)
+        self.finish()
+
+    def get_content_pages(self) -> Optional[list[int]]:
+        """
+        Get the pages of the content starts from the table of contents. Each content start pattern must match exactly
+        one TOC headline, otherwise it's ambiguous where the content starts and the whole text file must be parsed.
+
+        :return: Sorted page numbers of the TOC headlines matching a content start pattern or None if the reader
+            can't seek to the pages or the page of any content start is unknown or ambiguous
+        """
+        if self.reader.page_markers is None:
+            return None
+        content_pages: set[int] = set()
+        for content_pattern in self.content_patterns:
+            pages = [int(page_no) for headline, page_no in self.toc.all_headlines.items()
+                     if content_pattern.start(headline)]
+            if len(pages) != 1 or pages[0] not in self.reader.page_starts:
+                log.debug(f"Content start {content_pattern.start_pattern.pattern} found on the TOC pages {pages} => "
+                          f"Parse the whole file")
+                return None
+            content_pages.update(pages)
+        return sorted(content_pages)
+
+    @staticmethod
+    def parse_content_pages(parsers: list["ItemParser"]) -> bool:
+        """
+        Parse the content of the started parsers beginning at the pages of the content starts from the table of
+        contents. Each line is passed to all parsers and the pages between the contents are skipped. If the parsers
+        return False, then they must be started again and the whole text file must be parsed.
+
+        :param parsers: Parsers which have been started
+        :return: True if all contents have been parsed, False if the page of any content start is unknown or the
+            content doesn't start on the page from the table of contents
+        """
+        reader: RewindReader = SystemConfig().reader
+        page_parsers: dict[int, list[ItemParser]] = {}
+        for parser in parsers:
+            if not (content_pages := parser.get_content_pages()):
+                return False
+            for page_no in content_pages:
+                page_parsers.setdefault(page_no, []).append(parser)
+        for page_no, expected_parsers in sorted(page_parsers.items()):
+            if reader.page_starts[page_no] >= reader.tell():
+                reader.seek_to_page(page_no)
+                log.debug(f"Jump to page {page_no} ({reader.location()})")
+            # Otherwise the previous content has been stopped on this page, so continue at the current position
+            for line in reader:
+                waiting = [parser for parser in expected_parsers if page_no not in parser.content_start_pages]
+                if waiting and reader.page_no != page_no:
+                    break
+                for parser in parsers:
+                    parser.parse_line(line)
+                if not waiting and not any(parser.content_pattern for parser in parsers):
+                    break
+            waiting = [parser for parser in expected_parsers if page_no not in parser.content_start_pages]
+            if waiting:
+                log.warning(f"Content start of the {', '.join(parser.doc_item_class.plural() for parser in waiting)} "
+                            f"not found on page {page_no} from the TOC ({reader.location()}) => Parse the whole file")
+                return False
+        return True
+
+    def start(self):
+        """
+        Start parsing the text file. Afterward each line must be passed to ``parse_line()`` and at the end of the file
+        ``finish()`` must be called. This way several parsers can parse the text file in a single pass.
+        """
+        log_step(f"Parse {self.doc_item_class.plural()} in {self.reader.file}")
+        self.content_pattern = None
+        self.content_start_pages = set()
+        self.all_items = {}
+        self.item_cnt = 0
+        self.duplicate_cnt = 0
+
+    def parse_line(self, line: str):
+        """
+        Parse the next line of the text file. The reader must be located after this line, so the following lines can
+        be checked.
+
+        :param line: Line read from the reader
+        """
+        if not self.content_pattern and not self.search_content_start(line):
+            return
+        # The line which stops the content might start the next content
+        if self.scan_line(line) and self.search_content_start(line):
+            self.scan_line(line)
+
+    def finish(self):
+        """
+        Finish parsing after the last line of the text file.
+        """
+        if self.content_pattern:
+            # The content hasn't been stopped until the end of the file
+            self.finish_scan()
         log.info(f"{self.item_cnt} {self.doc_item_class.plural()} found")
         log.info(f"{self.duplicate_cnt} duplicate {self.doc_item_class.plural()}")
 
-    def search_content_start(self) -> ContentPattern:
+    def search_content_start(self, line: str) -> Optional[ContentPattern]:
         """
-        Find the line where the content will start.
+        Check if the content starts with the line. If so then the scanning of the items is started.
 
-        :return: ContentPattern or None if not content was found
+        :param line: Line to check
+        :return: ContentPattern or None if the content does not start with this line
         """
-        for line in self.reader:
-            # Search for the content
-            for content_pattern in self.content_patterns:
-                if content_pattern.start(line):
-                    log.debug(f"Found Content Start ({self.reader.location()})")
-                    self.reader.rewind()
-                    self.content_pattern = content_pattern
-                    break
-            if self.content_pattern:
-                break
+        if content_pattern := self.content_patterns.start(line):
+            log.debug(f"Found Content Start ({self.reader.location()})")
+            self.content_pattern = content_pattern
+            self.content_start_pages.add(self.reader.page_no)
+            self.start_scan()
         return self.content_pattern
 
-    def scan_items(self):
+    def start_scan(self):
         """
-        Scan items.
+        Start scanning the items of the content.
         """
         self.item_list: list[DocItem] = []
         self.headline = ""
@@ -147,70 +242,83 @@ class ItemParser:
         self.item_cnt = 0
         self.last_line = None
         self.doc_state = DocState.NONE
-        for line in self.reader:
-            # Check if this is the end of the content search
-            if self.content_pattern.stop(line):
-                if self.finalize_item_list:
-                    self.finalize_item_list()
-                self.reader.rewind()
-                self.content_pattern = None
-                break
-            # Check for headlines
-            elif line in self.toc.all_headlines:
+
+    def scan_line(self, line: str) -> bool:
+        """
+        Scan a line of the content for items.
+
+        :param line: Line to scan
+        :return: True if the line stops the content, False otherwise
+        """
+        # Check if this is the end of the content search
+        if self.content_pattern.stop(line):
+            if self.finalize_item_list:
+                self.finalize_item_list()
+            self.content_pattern = None
+            self.finish_scan()
+            return True
+        # Check for headlines
+        elif line in self.toc.all_headlines:
+            if self.finalize_item_list:
+                self.finalize_item_list()
+            self.headline = line
+            if self.headline in self.toc.all_categories:
+                self.chapter_categories = self.toc.all_categories[self.headline]
+            else:
+                self.chapter_categories = {}
+            self.category = ""
+            if self.on_headline:
+                self.on_headline(line)
+            self.item_list = []
+            log.debug(f"- Headline: {self.headline} ({self.reader.location()})")
+            self.doc_state = DocState.NONE
+        # Check for categories
+        # Some categories are not mentioned in the table of contents => Those are marked with "[C]"
+        # Sometimes in the "See Also" section there is also a reference to another category
+        elif self.doc_state != DocState.SEE_ALSO and self.check_category(line):
+            if self.finalize_item_list:
+                self.finalize_item_list()
+            if line.startswith("[C]"):
+                line = line[3:]
+            self.category = line
+            if self.on_category:
+                self.on_category(line)
+            self.doc_state = DocState.CATEGORY
+            self.item_list = []
+            log.debug(f"   - ItemType: {self.category} ({self.reader.location()})")
+        elif self.doc_state != DocState.NONE:
+            # Check for items
+            if new_doc_state := self.check_item(line):
+                self.doc_state = new_doc_state
+            # Check for remarks
+            elif self.REMARKS_PATTERN.match(line):
+                self.doc_state = DocState.REMARKS
+            # Check for examples
+            elif self.EXAMPLES_PATTERN.match(line):
+                self.doc_state = DocState.EXAMPLES
+            # Check for see also
+            elif self.SEE_ALSO_PATTERN.match(line):
+                self.doc_state = DocState.SEE_ALSO
+            # Add line to corresponding item documentation
+            elif self.doc_state != DocState.CATEGORY:
+                self.add_item_documentation(line)
+            if self.item_list and not self.skip_parsed_line:
+                self.item_list[-1].parsed_text += f"{line}\n"
+            self.skip_parsed_line = False
+            # 1 empty lines in the See Also section is a signal for the end of the description or
+            # 2 empty lines are a signal for the end of the description
+            if line == "" and (self.doc_state == DocState.SEE_ALSO or self.last_line == ""):
                 if self.finalize_item_list:
                     self.finalize_item_list()
-                self.headline = line
-                if self.headline in self.toc.all_categories:
-                    self.chapter_categories = self.toc.all_categories[self.headline]
-                else:
-                    self.chapter_categories = {}
-                self.category = ""
-                if self.on_headline:
-                    self.on_headline(line)
                 self.item_list = []
-                log.debug(f"- Headline: {self.headline} ({self.reader.location()})")
-                self.doc_state = DocState.NONE
-            # Check for categories
-            # Some categories are not mentioned in the table of contents => Those are marked with "[C]"
-            # Sometimes in the "See Also" section there is also a reference to another category
-            elif self.doc_state != DocState.SEE_ALSO and self.check_category(line):
-                if self.finalize_item_list:
-                    self.finalize_item_list()
-                if line.startswith("[C]"):
-                    line = line[3:]
-                self.category = line
-                if self.on_category:
-                    self.on_category(line)
                 self.doc_state = DocState.CATEGORY
-                self.item_list = []
-                log.debug(f"   - ItemType: {self.category} ({self.reader.location()})")
-            elif self.doc_state != DocState.NONE:
-                # Check for items
-                if new_doc_state := self.check_item(line):
-                    self.doc_state = new_doc_state
-                # Check for remarks
-                elif self.REMARKS_PATTERN.match(line):
-                    self.doc_state = DocState.REMARKS
-                # Check for examples
-                elif self.EXAMPLES_PATTERN.match(line):
-                    self.doc_state = DocState.EXAMPLES
-                # Check for see also
-                elif self.SEE_ALSO_PATTERN.match(line):
-                    self.doc_state = DocState.SEE_ALSO
-                # Add line to corresponding item documentation
-                elif self.doc_state != DocState.CATEGORY:
-                    self.add_item_documentation(line)
-                if self.item_list and not self.skip_parsed_line:
-                    self.item_list[-1].parsed_text += f"{line}\n"
-                self.skip_parsed_line = False
-                # 1 empty lines in the See Also section is a signal for the end of the description or
-                # 2 empty lines are a signal for the end of the description
-                if line == "" and (self.doc_state == DocState.SEE_ALSO or self.last_line == ""):
-                    if self.finalize_item_list:
-                        self.finalize_item_list()
-                    self.item_list = []
-                    self.doc_state = DocState.CATEGORY
-            self.last_line = line
+        self.last_line = line
+        return False
+
+    def finish_scan(self):
+        """
+        Finish scanning the items of the content.
+        """
         # Fix all descriptions, e.g. remove newlines at begin and end
         for cur_item_list in self.all_items.values():
             for cur_item in cur_item_list:
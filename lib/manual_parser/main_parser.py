@@ -16,23 +16,32 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 ##############################################################################
+import hashlib
 import logging
 import pkgutil
 import re
 import shutil
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from importlib import import_module
 from pathlib import Path
-from typing import Optional, Any, Union
+from typing import Optional, Any, Union, Iterator
 
-import pypdf._text_extraction._layout_mode._fixed_width_page
 from pypdf import PageObject, PdfReader
 
 from manual_parser.item_parser import ItemParser
 from manual_parser.toc_parser import TocParser
 from config.constants import ItemType
 from config.system_config import SystemConfig
+from util.conversion_metrics import ConversionMetrics
 from util.format_util import headline, log_step
+from util.memory_util import peak_rss_kib
+from util.page_cache import PageCache
+from util.patch_set import PatchSet
 from util.rewind_reader import RewindReader
+from util.text_extractor import TextExtractor
 
 log = logging.getLogger(__name__)
 
@@ -40,6 +49,10 @@ log = logging.getLogger(__name__)
 class MainParser:
     PAGE_PATTERN = re.compile(f"{'<' * 20} (?:Table of Contents )?Page (\\d+) {'>' * 20}")
     """Pattern to find a page number"""
+    TOC_PAGE_PATTERN = re.compile(f"{'<' * 20} Table of Contents Page \\d+ {'>' * 20}")
+    """Pattern to find a page number of the table of contents"""
+    FINGERPRINT_FONT_KEYS = ["/FirstChar", "/LastChar", "/Widths", "/W", "/DW", "/Encoding"]
+    """Keys of a font (or its descendant font) which are added to the fingerprint of a page"""
 
     # Internally used to get the body of a page
     _parts: list[str] = []
@@ -51,55 +64,506 @@ class MainParser:
         self.items: Optional[ItemParser] = None
 
     @staticmethod
-    def fixed_char_width_hack(a, b) -> float:
-        """
-        Currently the original function pypdf._text_extraction._layout_mode._fixed_width_page returns a ZeroDivisionError.
-        So return a fixed value here.
-        """
-        return 200.0
-
-    @staticmethod
-    def convert_to_text():
+    def convert_to_text(jobs: int = 1, use_cache: bool = True, incremental: bool = False, pages: str = "",
+                        chapters: str = "", output_file: Optional[Path] = None, recycle_pages: int = 0,
+                        summary_file: Optional[Path] = None, patch_set_file: Optional[Path] = None):
         """
         Convert the PDF file to text.
+
+        :param jobs: Number of worker processes to extract the text of the pages or 1 to extract them in this process
+        :param use_cache: If True then the extracted pages are taken from/stored in the page cache (if configured)
+        :param incremental: If True then the pages which are unchanged compared to the previous conversion of another
+            PDF file (e.g. the previous release of the manual) are taken from the page cache and the changed pages are
+            reported
+        :param pages: Page numbers to convert as ranges, e.g. "12-20,35" or empty to convert all pages
+        :param chapters: Chapter numbers to convert as ranges, e.g. "5-7" or empty to convert all chapters
+        :param output_file: Text file for the converted pages if only some pages are converted or None to use the name
+            of the original text file with the suffix "_Partial"
+        :param recycle_pages: Number of pages after which a new PdfReader is opened to release the objects cached by
+            pypdf, so the memory doesn't grow with the number of pages, or 0 to use a single PdfReader
+        :param summary_file: JSON file for the summary of the conversion (throughput, slowest pages, ...) or None
+        :param patch_set_file: Patch set with the manual fixes (e.g. of the previous release of the manual) to create
+            the fixed text file if it doesn't exist yet or None to create it as copy of the original text file
         """
-        # Note: The original function pypdf._text_extraction._layout_mode._fixed_width_page.fixed_char_width returns
-        # a ZeroDivisionError => Hack the code to return a fixed value
-        pypdf._text_extraction._layout_mode._fixed_width_page.fixed_char_width.__code__ = MainParser.fixed_char_width_hack.__code__
         reader = PdfReader(SystemConfig().pdf_file)
-        # If a page offset is specified then first scan the table of contents
-        if SystemConfig().page_offset > 0:
-            toc = "Table of Contents "
-        else:
-            toc = ""
-        SystemConfig().txt_file_original.parent.mkdir(parents=True, exist_ok=True)
-        with SystemConfig().txt_file_original.open("w", encoding='utf-8') as f:
-            log.info(f"Convert PDF to TEXT: {SystemConfig().pdf_file} -> {SystemConfig().txt_file_original}")
-            page_cnt = 0
-            for page in reader.pages:
-                f.write(f"{'<' * 20} {toc}Page {page_cnt + 1} {'>' * 20}\n")
-                f.write(MainParser.get_body(page, toc))
-                if page_cnt and page_cnt % 80 == 0:
-                    print("")
-                page_cnt += 1
-                if toc and SystemConfig().page_offset == page_cnt:
-                    page_cnt = 0
-                    toc = ""
-                print(".", end="")
-            print("")
-            log.info(f"{page_cnt} pages converted")
-        if not SystemConfig().txt_file_fixed.is_file():
+        use_cache = use_cache and SystemConfig().page_cache_file is not None
+        if use_cache:
+            log.info(f"Use page cache {SystemConfig().page_cache_file}")
+        with PageCache(SystemConfig().page_cache_file, SystemConfig().pdf_file, MainParser.extractor_identifier) \
+                if use_cache else nullcontext() as cache:
+            if pages or chapters:
+                if incremental:
+                    log.warning("The incremental conversion is only done for all pages => Ignore it")
+                page_indexes, extracted_pages = MainParser.select_pages(reader, pages, chapters, cache)
+                if not output_file:
+                    original = SystemConfig().txt_file_original
+                    stem, _, suffixes = original.name.partition(".")
+                    output_file = original.with_name(f"{stem}_Partial.{suffixes}")
+                metrics = MainParser.write_text(reader, jobs, cache, page_indexes, output_file, recycle_pages,
+                                                extracted_pages)
+                MainParser.log_peak_memory(jobs)
+                if summary_file:
+                    metrics.write_summary(summary_file)
+                return
+            if cache:
+                MainParser.compare_pages(reader, cache, incremental, recycle_pages)
+            elif incremental:
+                log.warning("The incremental conversion requires the page cache => Convert all pages")
+            metrics = MainParser.write_text(reader, jobs, cache, recycle_pages=recycle_pages)
+        MainParser.log_peak_memory(jobs)
+        if summary_file:
+            metrics.write_summary(summary_file)
+        if not SystemConfig().txt_file_fixed.is_file() and patch_set_file:
+            MainParser.apply_patch_set(patch_set_file)
+        elif not SystemConfig().txt_file_fixed.is_file():
             log.info(f"Copy {SystemConfig().txt_file_original.as_posix()} -> {SystemConfig().txt_file_fixed.as_posix()}")
             shutil.copyfile(SystemConfig().txt_file_original, SystemConfig().txt_file_fixed)
             log.info(f"TODO: Manually fix the content of {SystemConfig().txt_file_fixed}")
         else:
             log.info(f"TODO: Update the content of {SystemConfig().txt_file_fixed}")
 
-    def parse(self):
+    @staticmethod
+    def create_patch_set():
+        """
+        Store the manual fixes, i.e. the differences between the original and the fixed text file, as patch set.
+        """
+        patch_set_file = SystemConfig().patch_set_file
+        if not patch_set_file:
+            raise ValueError(f"No patch_set_file configured in {SystemConfig().ini_file}")
+        original = SystemConfig().txt_file_original.read_text(encoding="utf-8")
+        fixed = SystemConfig().txt_file_fixed.read_text(encoding="utf-8")
+        patch_set = PatchSet.create(original, fixed)
+        patch_set.save(patch_set_file)
+        log.info(f"{len(patch_set.hunks)} fixes written to {patch_set_file}")
+
+    @staticmethod
+    def apply_patch_set(patch_set_file: Path):
+        """
+        Create the fixed text file by replaying the manual fixes of a patch set (e.g. of the previous release of the
+        manual) on the original text file. The fixes which can't be applied are written to the rejects file for manual
+        resolution.
+
+        :param patch_set_file: Patch set to replay
+        """
+        log.info(f"Apply {patch_set_file.as_posix()} to {SystemConfig().txt_file_original.as_posix()} -> "
+                 f"{SystemConfig().txt_file_fixed.as_posix()}")
+        patch_set = PatchSet.load(patch_set_file)
+        fixed, rejected = patch_set.apply(SystemConfig().txt_file_original.read_text(encoding="utf-8"))
+        SystemConfig().txt_file_fixed.write_text(fixed, encoding="utf-8")
+        log.info(f"{len(patch_set.hunks) - len(rejected)} of {len(patch_set.hunks)} fixes applied")
+        rejects_file = SystemConfig().patch_rejects_file
+        if rejected and rejects_file:
+            PatchSet.write_rejects(rejects_file, rejected)
+            log.info(f"TODO: Manually apply the {len(rejected)} fixes in {rejects_file} to "
+                     f"{SystemConfig().txt_file_fixed}")
+        elif rejected:
+            for hunk in rejected:
+                log.info(f"Fix not applied:\n{hunk}")
+            log.info(f"TODO: Manually apply the {len(rejected)} fixes above to {SystemConfig().txt_file_fixed}")
+        elif rejects_file:
+            rejects_file.unlink(missing_ok=True)
+
+    @staticmethod
+    def write_text(reader: PdfReader, jobs: int = 1, cache: Optional[PageCache] = None,
+                   page_indexes: Optional[list[int]] = None, txt_file: Optional[Path] = None,
+                   recycle_pages: int = 0,
+                   extracted_pages: Optional[dict[int, tuple[str, Optional[float]]]] = None) -> ConversionMetrics:
+        """
+        Write the text of the pages to the text file. Each page is written as soon as it has been extracted and the
+        progress is logged from time to time.
+
+        :param reader: Reader of the PDF file
+        :param jobs: Number of worker processes to extract the text of the pages or 1 to extract them in this process
+        :param cache: Cache of the extracted pages or None to extract all pages
+        :param page_indexes: Indexes of the pages to write or None to write all pages
+        :param txt_file: Text file to write or None to write the original text file
+        :param recycle_pages: Number of pages after which a new PdfReader is opened or 0 to use a single PdfReader
+        :param extracted_pages: Text and extraction time of the pages which have already been extracted (e.g. the
+            table of contents for resolving the chapters) or None
+        :return: Metrics of the conversion
+        """
+        if page_indexes is None:
+            page_indexes = list(range(len(reader.pages)))
+        txt_file = txt_file or SystemConfig().txt_file_original
+        txt_file.parent.mkdir(parents=True, exist_ok=True)
+        with txt_file.open("w", encoding='utf-8') as f:
+            log.info(f"Convert PDF to TEXT: {SystemConfig().pdf_file} -> {txt_file}")
+            page_cnt = 0
+            metrics = ConversionMetrics(len(page_indexes))
+            contents = MainParser.extract_pages(reader, page_indexes, jobs, cache, recycle_pages, extracted_pages)
+            for index, (content, extraction_time) in zip(page_indexes, contents):
+                # If a page offset is specified then the first pages are the table of contents
+                toc = "Table of Contents " if index < SystemConfig().page_offset else ""
+                label = MainParser.page_label(index)
+                text = f"{'<' * 20} {label} {'>' * 20}\n{MainParser.get_body(content, toc)}"
+                f.write(text)
+                f.flush()
+                metrics.add_page(label, len(text.encode("utf-8")), extraction_time)
+                if not toc:
+                    page_cnt += 1
+            log.info(f"{page_cnt} pages converted")
+            metrics.log_summary()
+        return metrics
+
+    @staticmethod
+    def select_pages(reader: PdfReader, pages: str, chapters: str, cache: Optional[PageCache] = None) \
+            -> tuple[list[int], dict[int, tuple[str, Optional[float]]]]:
+        """
+        Get the pages to convert. The pages of the table of contents are always converted, because they are needed by
+        the parser.
+
+        :param reader: Reader of the PDF file
+        :param pages: Page numbers as ranges, e.g. "12-20,35" or empty for no pages
+        :param chapters: Chapter numbers as ranges, e.g. "5-7" or empty for no chapters
+        :param cache: Cache of the extracted pages or None
+        :return: Tuple of the sorted page indexes starting with 0 and the pages of the table of contents which have
+            been extracted to resolve the chapters (see ``extract_pages()``), so they needn't be extracted again
+        """
+        page_offset = SystemConfig().page_offset
+        page_indexes = set(range(min(page_offset, len(reader.pages))))
+        for page_no in MainParser.parse_ranges(pages):
+            page_indexes.add(page_no - 1 + page_offset)
+        extracted_pages: dict[int, tuple[str, Optional[float]]] = {}
+        if chapters:
+            chapter_pages, extracted_pages = MainParser.get_chapter_pages(reader, cache)
+            for chapter in MainParser.parse_ranges(chapters):
+                if chapter not in chapter_pages:
+                    raise ValueError(f"Chapter {chapter} not found in the table of contents")
+                first_page, last_page = chapter_pages[chapter]
+                log.info(f"Chapter {chapter}: Page {first_page} - {last_page}")
+                page_indexes.update(range(first_page - 1 + page_offset, last_page + page_offset))
+        page_indexes = sorted(index for index in page_indexes if index < len(reader.pages))
+        log.info(f"Convert {len(page_indexes)} of {len(reader.pages)} pages")
+        return page_indexes, extracted_pages
+
+    @staticmethod
+    def get_chapter_pages(reader: PdfReader, cache: Optional[PageCache] = None) \
+            -> tuple[dict[int, tuple[int, int]], dict[int, tuple[str, Optional[float]]]]:
+        """
+        Get the pages of each chapter from the headlines in the table of contents.
+
+        :param reader: Reader of the PDF file
+        :param cache: Cache of the extracted pages or None
+        :return: Tuple of a dictionary where the key is the chapter number and the value a tuple with the first and
+            last page number and a dictionary with the extracted pages of the table of contents (see
+            ``extract_pages()``) where the key is the page index
+        """
+        page_offset = SystemConfig().page_offset
+        if page_offset <= 0:
+            raise ValueError("Chapters can only be resolved with a page_offset for the table of contents")
+        toc_indexes = list(range(min(page_offset, len(reader.pages))))
+        first_pages: dict[int, int] = {}
+        toc_pages = dict(zip(toc_indexes, MainParser.extract_pages(reader, toc_indexes, 1, cache)))
+        for content, _ in toc_pages.values():
+            for line in content.splitlines():
+                if m := TocParser.TOC_HEADLINE_PATTERN.match(line.strip()):
+                    first_pages[int(m.group(1).split(".")[0])] = int(m.group(2))
+        chapter_pages: dict[int, tuple[int, int]] = {}
+        last_page_no = len(reader.pages) - page_offset
+        chapters = sorted(first_pages.items(), key=lambda item: item[1])
+        for i, (chapter, first_page) in enumerate(chapters):
+            # A chapter ends on the page where the next one starts, because a chapter might start in the page middle
+            last_page = chapters[i + 1][1] if i + 1 < len(chapters) else last_page_no
+            chapter_pages[chapter] = (first_page, max(first_page, last_page))
+        return chapter_pages, toc_pages
+
+    @staticmethod
+    def parse_ranges(ranges: str) -> list[int]:
+        """
+        :param ranges: Comma separated numbers or ranges of numbers, e.g. "5-7,9"
+        :return: All numbers in the ranges, e.g. [5, 6, 7, 9]
+        """
+        numbers: list[int] = []
+        for part in ranges.split(","):
+            if part.strip():
+                first, _, last = part.partition("-")
+                numbers.extend(range(int(first), int(last or first) + 1))
+        return numbers
+
+    @staticmethod
+    def compare_pages(reader: PdfReader, cache: PageCache, incremental: bool, recycle_pages: int = 0):
+        """
+        Store the fingerprints of all pages in the page cache. For an incremental conversion the unchanged pages are
+        taken from the previous conversion and the changed pages are reported.
+
+        :param reader: Reader of the PDF file
+        :param cache: Cache of the extracted pages
+        :param incremental: If True then the unchanged pages are taken from the previous conversion
+        :param recycle_pages: Number of pages after which a new PdfReader is opened or 0 to use a single PdfReader
+        """
+        pages = MainParser.iter_pages(reader, list(range(len(reader.pages))), recycle_pages)
+        fingerprints = {index: MainParser.page_fingerprint(page) for index, page in pages}
+        cache.put_fingerprints(fingerprints)
+        if not incremental:
+            return
+        previous = cache.previous_conversion()
+        if not previous:
+            log.info("No previous conversion found => Convert all pages")
+            return
+        previous_hash, previous_pdf_file = previous
+        previous_fingerprints = set(cache.get_fingerprints(previous_hash).values())
+        cached = cache.page_indexes()
+        changed: list[int] = []
+        reused = 0
+        for index, fingerprint in fingerprints.items():
+            if fingerprint not in previous_fingerprints:
+                changed.append(index)
+            elif index not in cached and (content := cache.get_by_fingerprint(fingerprint, index)) is not None:
+                cache.put(index, content)
+                reused += 1
+        log.info(f"{len(changed)} of {len(fingerprints)} pages changed compared to {previous_pdf_file}, "
+                 f"{reused} unchanged pages taken from the page cache")
+        MainParser.write_changed_pages(changed, previous_pdf_file)
+
+    @staticmethod
+    def write_changed_pages(changed: list[int], previous_pdf_file: str):
+        """
+        Report the changed pages, so the manual merge into the fixed text file can focus on them.
+        The pages are written to the log and to the changed pages file (if configured).
+
+        :param changed: Indexes of the changed pages
+        :param previous_pdf_file: Path of the PDF file of the previous conversion
+        """
+        labels = [MainParser.page_label(index) for index in changed]
+        for label in labels:
+            log.info(f"- Changed: {label}")
+        if SystemConfig().changed_pages_file:
+            log.info(f"Write changed pages to {SystemConfig().changed_pages_file}")
+            SystemConfig().changed_pages_file.parent.mkdir(parents=True, exist_ok=True)
+            with SystemConfig().changed_pages_file.open("w", encoding='utf-8') as f:
+                f.write(f"# Pages of {SystemConfig().pdf_file.as_posix()} changed compared to {previous_pdf_file}\n")
+                for label in labels:
+                    f.write(f"{label}\n")
+
+    @staticmethod
+    def page_label(index: int) -> str:
+        """
+        :param index: Index of the page in the PDF file starting with 0
+        :return: Page as written in the page marker of the text file, e.g. "Table of Contents Page 3" or "Page 12"
+        """
+        if index < SystemConfig().page_offset:
+            return f"Table of Contents Page {index + 1}"
+        return f"Page {index - SystemConfig().page_offset + 1}"
+
+    @staticmethod
+    def page_fingerprint(page: PageObject) -> str:
+        """
+        Get the fingerprint of a page from its content stream, its size and its resources, which determine the
+        extracted text. These are the fonts inclusive their widths and encodings and the form XObjects inclusive their
+        own resources. It's much faster to get than extracting the text.
+
+        :param page: Page read from PdfReader
+        :return: SHA-256 hex digest of the page content
+        """
+        sha256 = hashlib.sha256()
+        contents = page.get_contents()
+        if contents is not None:
+            sha256.update(contents.get_data())
+        sha256.update(f"{list(page.mediabox)} {page.rotation}".encode("utf-8"))
+        MainParser.update_fingerprint_resources(sha256, page.get("/Resources"), set())
+        return sha256.hexdigest()
+
+    @staticmethod
+    def update_fingerprint_resources(sha256: Any, resources: Any, visited: set[int]):
+        """
+        Add the fonts and form XObjects of the resources to the fingerprint of a page.
+
+        :param sha256: Hash object of the fingerprint
+        :param resources: Resources dictionary of a page or of a form XObject (or None)
+        :param visited: Ids of the already added form XObjects to avoid endless recursions
+        """
+        if resources is None:
+            return
+        resources = resources.get_object()
+        fonts = resources.get("/Font")
+        fonts = fonts.get_object() if fonts is not None else {}
+        for name in sorted(fonts):
+            font = fonts[name].get_object()
+            sha256.update(f"{name} {font.get('/BaseFont')}".encode("utf-8"))
+            if "/ToUnicode" in font:
+                sha256.update(font["/ToUnicode"].get_object().get_data())
+            # The widths determine the positions of the characters in the layout mode
+            fonts_to_hash = [font] + [descendant.get_object() for descendant in font.get("/DescendantFonts", [])]
+            for font_to_hash in fonts_to_hash:
+                for key in MainParser.FINGERPRINT_FONT_KEYS:
+                    if key in font_to_hash:
+                        sha256.update(f"{key} {MainParser.fingerprint_value(font_to_hash[key])}".encode("utf-8"))
+        xobjects = resources.get("/XObject")
+        xobjects = xobjects.get_object() if xobjects is not None else {}
+        for name in sorted(xobjects):
+            reference = xobjects[name]
+            xobject = reference.get_object()
+            # Only form XObjects contain text, images are skipped
+            if xobject.get("/Subtype") != "/Form":
+                continue
+            key = id(xobject) if not hasattr(reference, "idnum") else reference.idnum
+            if key in visited:
+                continue
+            visited.add(key)
+            sha256.update(f"{name} {MainParser.fingerprint_value(xobject.get('/Matrix'))}".encode("utf-8"))
+            sha256.update(xobject.get_data())
+            MainParser.update_fingerprint_resources(sha256, xobject.get("/Resources"), visited)
+
+    @staticmethod
+    def fingerprint_value(value: Any) -> str:
+        """
+        :param value: PDF object, e.g. the widths of a font
+        :return: Text representation of the object where all indirect objects are resolved, so it doesn't depend on
+            the object numbers in the PDF file
+        """
+        value = value.get_object() if value is not None else None
+        if isinstance(value, list):
+            return f"[{' '.join(MainParser.fingerprint_value(item) for item in value)}]"
+        if isinstance(value, dict):
+            return f"<<{' '.join(f'{key} {MainParser.fingerprint_value(value[key])}' for key in sorted(value))}>>"
+        return str(value)
+
+    @staticmethod
+    def extract_pages(reader: PdfReader, page_indexes: list[int], jobs: int = 1, cache: Optional[PageCache] = None,
+                      recycle_pages: int = 0, extracted_pages: Optional[dict[int, tuple[str, Optional[float]]]] = None
+                      ) -> Iterator[tuple[str, Optional[float]]]:
+        """
+        Extract the text of the pages in the order of the page indexes. Only the pages which are neither already
+        extracted nor cached are extracted from the PDF.
+
+        :param reader: Reader of the PDF file
+        :param page_indexes: Indexes of the pages to extract
+        :param jobs: Number of worker processes or 1 to extract the pages in this process
+        :param cache: Cache of the extracted pages or None to extract all pages
+        :param recycle_pages: Number of pages after which a new PdfReader is opened or 0 to use a single PdfReader
+        :param extracted_pages: Text and extraction time of the pages which have already been extracted or None
+        :return: Iterator over tuples of the extracted text and the extraction time in seconds of each page, where the
+            extraction time is None if the page has been taken from the cache
+        """
+        extracted_pages = extracted_pages or {}
+        cached = cache.page_indexes() if cache else set()
+        missing = [index for index in page_indexes if index not in cached and index not in extracted_pages]
+        if cache:
+            log.info(f"{len(page_indexes) - len(missing)} pages cached, {len(missing)} pages to extract")
+        extracted = MainParser.extract_page_indexes(reader, missing, jobs, recycle_pages)
+        for index in page_indexes:
+            if index in extracted_pages:
+                yield extracted_pages[index]
+            elif index in cached:
+                yield cache.get(index), None
+            else:
+                content, extraction_time = next(extracted)
+                if cache:
+                    cache.put(index, content)
+                yield content, extraction_time
+
+    @staticmethod
+    def extract_page_indexes(reader: PdfReader, page_indexes: list[int], jobs: int = 1,
+                             recycle_pages: int = 0) -> Iterator[tuple[str, float]]:
+        """
+        Extract the text of the specified pages in the order of the page indexes.
+        With multiple jobs the pages are split into chunks which are extracted by a pool of worker processes, where
+        each worker opens its own PdfReader per chunk. The chunks are still returned in the order of the page indexes.
+
+        :param reader: Reader of the PDF file
+        :param page_indexes: Indexes of the pages to extract
+        :param jobs: Number of worker processes or 1 to extract the pages in this process
+        :param recycle_pages: Number of pages after which a new PdfReader is opened or 0 to use a single PdfReader
+        :return: Iterator over tuples of the extracted text and the extraction time in seconds of each page
+        """
+        if jobs <= 1 or len(page_indexes) <= 1:
+            for index, page in MainParser.iter_pages(reader, page_indexes, recycle_pages):
+                yield MainParser.extract_page(page, MainParser.get_extractor(index))
+            return
+        # Use several chunks per worker, because the extraction time differs a lot between the pages
+        chunk_size = max(1, -(-len(page_indexes) // (jobs * 4)))
+        if recycle_pages > 0:
+            # The PdfReader of a chunk is released after the chunk has been extracted
+            chunk_size = min(chunk_size, recycle_pages)
+        chunks = [page_indexes[start:start + chunk_size] for start in range(0, len(page_indexes), chunk_size)]
+        log.info(f"Extract {len(page_indexes)} pages in {len(chunks)} chunks with {jobs} worker processes")
+        # The extractors are passed to the workers, because the system configuration isn't available there
+        extractors = [[MainParser.get_extractor(index) for index in chunk] for chunk in chunks]
+        with ProcessPoolExecutor(jobs) as executor:
+            for contents in executor.map(_extract_page_range, [SystemConfig().pdf_file] * len(chunks), chunks,
+                                         extractors):
+                yield from contents
+
+    @staticmethod
+    def iter_pages(reader: PdfReader, page_indexes: list[int],
+                   recycle_pages: int = 0) -> Iterator[tuple[int, PageObject]]:
+        """
+        Iterate over the specified pages. pypdf caches the decoded content streams and fonts in the PdfReader, so with
+        recycling a new PdfReader is opened every few pages and the previous one is released.
+
+        :param reader: Reader of the PDF file which is used if the PdfReader is not recycled
+        :param page_indexes: Indexes of the pages
+        :param recycle_pages: Number of pages after which a new PdfReader is opened or 0 to use the specified reader
+        :return: Iterator over tuples of page index and page
+        """
+        for cnt, index in enumerate(page_indexes):
+            if recycle_pages > 0 and cnt % recycle_pages == 0:
+                reader = PdfReader(SystemConfig().pdf_file)
+            yield index, reader.pages[index]
+
+    @staticmethod
+    def log_peak_memory(jobs: int = 1):
+        """
+        Log the peak resident set size of this process and of the worker processes (if known on this platform).
+
+        :param jobs: Number of worker processes or 1 if the pages have been extracted in this process
+        """
+        peak_rss = peak_rss_kib()
+        if peak_rss is None:
+            return
+        message = f"Peak memory: {peak_rss / 1024:.1f} MiB"
+        worker_peak_rss = peak_rss_kib(children=True) if jobs > 1 else None
+        if worker_peak_rss:
+            message += f" (worker processes: {worker_peak_rss / 1024:.1f} MiB)"
+        log.info(message)
+
+    @staticmethod
+    def extract_page(page: PageObject, extractor: TextExtractor) -> tuple[str, float]:
+        """
+        Extract the text of a page and measure the extraction time.
+
+        :param page: Page read from PdfReader
+        :param extractor: Text extractor for the page
+        :return: Tuple of the extracted text and the extraction time in seconds
+        """
+        start = time.perf_counter()
+        content = extractor.extract(page)
+        return content, time.perf_counter() - start
+
+    @staticmethod
+    def get_extractor(index: int) -> TextExtractor:
         """
-        Parse the content of the text file.
+        Get the text extractor configured for a page. The pages of the table of contents might use another text
+        extractor than the other pages.
+
+        :param index: Index of the page starting with 0
+        :return: Text extractor for the page
         """
-        with RewindReader(SystemConfig().txt_file_fixed, page_no_pattern=MainParser.PAGE_PATTERN) as reader:
+        if index < SystemConfig().page_offset:
+            return TextExtractor.create(SystemConfig().toc_text_extractor)
+        return TextExtractor.create(SystemConfig().text_extractor)
+
+    @staticmethod
+    def extractor_identifier(index: int) -> str:
+        """
+        The page offset decides whether the text extractor of the table of contents is used, so the identification
+        depends on the page.
+
+        :param index: Index of the page starting with 0
+        :return: Identification of the text extractor of the page for the page cache
+        """
+        return MainParser.get_extractor(index).identifier()
+
+    def parse(self, jobs: int = 1):
+        """
+        Parse the content of the text file. After the table of contents has been parsed, the items of all phases are
+        parsed in a single pass over the text file or in parallel by a pool of worker processes.
+
+        :param jobs: Number of worker processes, where each phase is parsed in a separate worker process, or 1 to
+            parse all phases in this process
+        """
+        with RewindReader(SystemConfig().txt_file_fixed, page_no_pattern=MainParser.PAGE_PATTERN,
+                          toc_page_pattern=MainParser.TOC_PAGE_PATTERN) as reader:
             SystemConfig().reader = reader
             headline("Processing Table of Contents (TOC)")
             toc: TocParser = MainParser.get_parser(ItemType.TOC)
@@ -107,25 +571,74 @@ class MainParser:
             if SystemConfig().dump:
                 toc.dump()
             SystemConfig().toc = toc
-            for item_type in ItemType.all_phases():
-                if SystemConfig().has_phase(item_type):
-                    headline(f"Processing {item_type.plural()}")
-                    self.items = MainParser.get_parser(item_type)
-                    self.items.parse()
-                    self.items.export()
-                    if SystemConfig().dump:
-                        self.items.dump(SystemConfig().verbose)
+            item_types = [item_type for item_type in ItemType.all_phases() if SystemConfig().has_phase(item_type)]
+            if not item_types:
+                return
+            if jobs > 1 and len(item_types) > 1:
+                MainParser.parse_phases_parallel(item_types, toc, jobs)
+                return
+            headline(f"Processing {', '.join(item_type.plural() for item_type in item_types)}")
+            parsers = [MainParser.get_parser(item_type) for item_type in item_types]
+            # Read the text file only once and pass each line to all parsers
+            for parser in parsers:
+                parser.start()
+            reader.reset()
+            if not ItemParser.parse_content_pages(parsers):
+                for parser in parsers:
+                    parser.start()
+                reader.reset()
+                for line in reader:
+                    for parser in parsers:
+                        parser.parse_line(line)
+            for item_type, parser in zip(item_types, parsers):
+                headline(f"Finish {item_type.plural()}")
+                parser.finish()
+                parser.export()
+                if SystemConfig().dump:
+                    parser.dump(SystemConfig().verbose)
+                self.items = parser
 
     @staticmethod
-    def get_body(page: PageObject, toc: str) -> str:
+    def parse_phases_parallel(item_types: list[ItemType], toc: TocParser, jobs: int):
+        """
+        Parse the phases in a pool of worker processes. Each worker reads the text file with its own reader and writes
+        the *.csv file of its phase. The log records of each worker are collected and logged in the order of the phases
+        once the phase is finished. If a phase fails then its log records are logged before the error is raised.
+
+        :param item_types: Phases to parse
+        :param toc: Parsed table of contents
+        :param jobs: Number of worker processes
+        """
+        jobs = min(jobs, len(item_types))
+        log.info(f"Parse {len(item_types)} phases with {jobs} worker processes")
+        counts: list[tuple[ItemType, int, int]] = []
+        # The table of contents is passed as dictionaries, because the TocParser contains the open reader
+        with ProcessPoolExecutor(jobs) as executor:
+            futures = [executor.submit(_parse_phase, SystemConfig().ini_file, item_type, toc.all_headlines,
+                                       toc.all_categories) for item_type in item_types]
+            for item_type, future in zip(item_types, futures):
+                item_cnt, duplicate_cnt, records, error = future.result()
+                headline(f"Processing {item_type.plural()}")
+                # The log records are replayed first, so the log shows what happened before an error
+                for record in records:
+                    logging.getLogger(record.name).handle(record)
+                if error:
+                    raise RuntimeError(f"Parsing the {item_type.plural()} failed in the worker process:\n{error}")
+                counts.append((item_type, item_cnt, duplicate_cnt))
+        headline("Summary")
+        for item_type, item_cnt, duplicate_cnt in counts:
+            log.info(f"{item_type.plural()}: {item_cnt} found, {duplicate_cnt} duplicates")
+
+    @staticmethod
+    def get_body(content: str, toc: str) -> str:
         """
         Get the page body without header and footer.
 
-        :param page: Page to scan read from PdfReader
+        :param content: Extracted text of the page
         :param toc: If this contains a string then the page is in the table of contents
         :return: Page body
         """
-        content = page.extract_text(extraction_mode="layout") + "\n"
+        content = content + "\n"
         if not toc:
             # Remove the first lines from the exported text which represents the footer
             extract = content.split("\n", SystemConfig().page_header_lines)[SystemConfig().page_header_lines]
@@ -194,6 +707,83 @@ class MainParser:
         return parser
 
 
+class _LogRecordCollector(logging.Handler):
+    def __init__(self):
+        """
+        Log handler which collects the log records in a worker process, so they can be logged by the main process.
+        """
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+        """Collected log records"""
+
+    def emit(self, record: logging.LogRecord):
+        """
+        Collect a log record. The message is formatted here, because the arguments might not be picklable.
+
+        :param record: Log record to collect
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+def _parse_phase(ini_file: Path, item_type: ItemType, all_headlines: dict[str, int],
+                 all_categories: dict[str, dict[str, int]]) -> tuple[int, int, list[logging.LogRecord], str]:
+    """
+    Parse a phase in a worker process and write its *.csv file. An exception is returned as formatted traceback
+    instead of being raised, so the collected log records are not lost.
+
+    :param ini_file: System configuration file
+    :param item_type: Phase to parse
+    :param all_headlines: Headlines of the table of contents, see ``TocParser.all_headlines``
+    :param all_categories: Categories of the table of contents, see ``TocParser.all_categories``
+    :return: Tuple of the number of found items, the number of duplicate items, the collected log records and the
+        formatted traceback of the exception (empty string if the phase was parsed successfully)
+    """
+    collector = _LogRecordCollector()
+    logger = logging.getLogger()
+    # The handlers of the main process might have been inherited
+    logger.handlers = [collector]
+    logger.setLevel(logging.DEBUG)
+    parser: Optional[ItemParser] = None
+    try:
+        SystemConfig(ini_file, init_logging=False)
+        with RewindReader(SystemConfig().txt_file_fixed, page_no_pattern=MainParser.PAGE_PATTERN,
+                          toc_page_pattern=MainParser.TOC_PAGE_PATTERN) as reader:
+            SystemConfig().reader = reader
+            toc = TocParser()
+            toc.all_headlines = all_headlines
+            toc.all_categories = all_categories
+            SystemConfig().toc = toc
+            parser = MainParser.get_parser(item_type)
+            parser.parse()
+            parser.export()
+            if SystemConfig().dump:
+                parser.dump(SystemConfig().verbose)
+    except Exception:
+        item_cnt, duplicate_cnt = (parser.item_cnt, parser.duplicate_cnt) if parser else (0, 0)
+        return item_cnt, duplicate_cnt, collector.records, traceback.format_exc()
+    return parser.item_cnt, parser.duplicate_cnt, collector.records, ""
+
+
+def _extract_page_range(pdf_file: Path, page_indexes: list[int],
+                        extractors: list[TextExtractor]) -> list[tuple[str, float]]:
+    """
+    Extract the text of some pages in a worker process.
+
+    :param pdf_file: PDF file to read
+    :param page_indexes: Indexes of the pages to extract
+    :param extractors: Text extractor for each page
+    :return: Tuples of the extracted text and the extraction time in seconds of each page
+    """
+    reader = PdfReader(pdf_file)
+    return [MainParser.extract_page(reader.pages[index], extractor)
+            for index, extractor in zip(page_indexes, extractors)]
+
+
 if __name__ == "__main__":
     # For testing only
     logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
@@ -53,8 +53,8 @@ class VariableParser(ItemParser):
         self.item_list_headline: str = ""
         self.comment: str = ""
 
-    def scan_items(self):
-        super().scan_items()
+    def finish_scan(self):
+        super().finish_scan()
         # Special handling for variable ranges, e.g. $MARK_1 ... $MARK_28
         # Copy some attributes from the last variable in range to the other
         for item_list in self.all_items.values():
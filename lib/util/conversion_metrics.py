@@ -0,0 +1,163 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from util.memory_util import peak_rss_kib
+
+log = logging.getLogger(__name__)
+
+
+class ConversionMetrics:
+    PROGRESS_INTERVAL = 5.0
+    """Minimum number of seconds between two progress messages"""
+    SLOWEST_PAGES = 10
+    """Number of slowest pages in the summary"""
+
+    def __init__(self, page_cnt: int):
+        """
+        Progress and throughput of the conversion of the PDF pages to text.
+
+        :param page_cnt: Number of pages to convert
+        """
+        self.page_cnt: int = page_cnt
+        """Number of pages to convert"""
+        self.converted_cnt: int = 0
+        """Number of pages converted so far"""
+        self.cached_cnt: int = 0
+        """Number of converted pages taken from the page cache"""
+        self.bytes_written: int = 0
+        """Number of bytes written to the text file"""
+        self.extraction_times: dict[str, float] = {}
+        """Dictionary where the key is the page label and the value the extraction time in seconds"""
+        self.start: float = time.perf_counter()
+        """Wall clock when the conversion has been started"""
+        self.last_progress: float = self.start
+        """Wall clock when the last progress message has been logged"""
+
+    def add_page(self, label: str, size: int, extraction_time: Optional[float]):
+        """
+        Add a converted page and log the progress from time to time.
+
+        :param label: Label of the page, e.g. "Page 12"
+        :param size: Number of bytes written for the page
+        :param extraction_time: Extraction time in seconds or None if the page has been taken from the page cache
+        """
+        self.converted_cnt += 1
+        self.bytes_written += size
+        if extraction_time is None:
+            self.cached_cnt += 1
+            log.debug(f"{label}: cached, {size} bytes")
+        else:
+            self.extraction_times[label] = extraction_time
+            log.debug(f"{label}: {extraction_time:.3f} s, {size} bytes")
+        now = time.perf_counter()
+        if now - self.last_progress >= ConversionMetrics.PROGRESS_INTERVAL:
+            self.last_progress = now
+            self.log_progress()
+
+    def elapsed(self) -> float:
+        """
+        :return: Number of seconds since the conversion has been started
+        """
+        return time.perf_counter() - self.start
+
+    def pages_per_sec(self) -> float:
+        """
+        :return: Number of converted pages per second
+        """
+        elapsed = self.elapsed()
+        return self.converted_cnt / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        """
+        :return: Estimated number of seconds until all pages are converted or None if it's unknown yet
+        """
+        pages_per_sec = self.pages_per_sec()
+        if not pages_per_sec:
+            return None
+        return (self.page_cnt - self.converted_cnt) / pages_per_sec
+
+    def slowest_pages(self, count: int = SLOWEST_PAGES) -> list[tuple[str, float]]:
+        """
+        :param count: Maximum number of pages
+        :return: List of tuples with page label and extraction time of the slowest extracted pages
+        """
+        return sorted(self.extraction_times.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def log_progress(self):
+        """
+        Log the number of converted pages, the throughput and the estimated remaining time.
+        """
+        eta = self.eta()
+        log.info(f"{self.converted_cnt}/{self.page_cnt} pages converted ({self.pages_per_sec():.1f} pages/s, "
+                 f"ETA {'?' if eta is None else ConversionMetrics.format_seconds(eta)})")
+
+    def log_summary(self):
+        """
+        Log the throughput, the bytes written and the slowest pages.
+        """
+        log.info(f"{self.converted_cnt} pages ({self.cached_cnt} cached) converted in "
+                 f"{ConversionMetrics.format_seconds(self.elapsed())} ({self.pages_per_sec():.1f} pages/s), "
+                 f"{self.bytes_written} bytes written")
+        slowest = self.slowest_pages()
+        if slowest:
+            log.info("Slowest pages:")
+            for label, extraction_time in slowest:
+                log.info(f"- {label}: {extraction_time:.3f} s")
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        :return: Summary of the conversion to be encoded as JSON
+        """
+        extraction_time = sum(self.extraction_times.values())
+        return {
+            "pages": self.converted_cnt,
+            "cached_pages": self.cached_cnt,
+            "extracted_pages": len(self.extraction_times),
+            "wall": round(self.elapsed(), 6),
+            "extraction_time": round(extraction_time, 6),
+            "pages_per_sec": round(self.pages_per_sec(), 3),
+            "bytes_written": self.bytes_written,
+            "peak_rss_kib": peak_rss_kib(),
+            "slowest_pages": [{"page": label, "extraction_time": round(seconds, 6)}
+                              for label, seconds in self.slowest_pages()]
+        }
+
+    def write_summary(self, summary_file: Path):
+        """
+        Write the summary of the conversion as JSON file.
+
+        :param summary_file: JSON file to write
+        """
+        summary_file.parent.mkdir(parents=True, exist_ok=True)
+        summary_file.write_text(json.dumps(self.as_dict(), indent=2) + "\n", encoding="utf-8")
+        log.info(f"Conversion summary written to {summary_file}")
+
+    @staticmethod
+    def format_seconds(seconds: float) -> str:
+        """
+        :param seconds: Number of seconds
+        :return: Duration formatted as minutes and seconds, e.g. "2:05"
+        """
+        minutes, seconds = divmod(round(seconds), 60)
+        return f"{minutes}:{seconds:02d}"
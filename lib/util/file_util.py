@@ -16,8 +16,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 ##############################################################################
+import compileall
 import json
 import logging
+import py_compile
+import sys
 from pathlib import Path
 
 import yaml
@@ -59,3 +62,20 @@ def yml2json(yml_file: Path, json_file: Path):
             json.dump(data, f, indent=4)
     else:
         raise FileNotFoundError(f"YAML input file {yml_file.as_posix()} not found")
+
+
+def compile_bytecode(source_dir: Path):
+    """
+    Compile all Python files in the given directory (recursively) to bytecode. The bytecode is hash-based, so it stays
+    valid when the files get new modification times, e.g. when the extension is installed. The bytecode is only used
+    by the same Python version, which is identified by the cache tag in the file names.
+
+    :param source_dir: Directory containing the Python files
+    """
+    if source_dir.is_dir():
+        log.info(f"Compile Python files in {source_dir.as_posix()} for {sys.implementation.cache_tag}")
+        if not compileall.compile_dir(source_dir, quiet=1,
+                                      invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH):
+            raise RuntimeError(f"Can't compile all Python files in {source_dir.as_posix()}")
+    else:
+        log.warning(f"Directory {source_dir.as_posix()} not found")
@@ -0,0 +1,42 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+# Keep in sync with vscode_extension/bin/_memory_util.py, because the extension ships its bin folder without lib
+import sys
+from typing import Optional
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+def peak_rss_kib(children: bool = False) -> Optional[int]:
+    """
+    Get the peak resident set size (RSS).
+
+    :param children: If True then the peak RSS of the largest terminated child process (e.g. a worker process) is
+        returned instead of the peak RSS of this process
+    :return: Peak RSS in KiB or None if it's unknown on this platform
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
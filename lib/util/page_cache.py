@@ -0,0 +1,169 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+import hashlib
+import logging
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from types import TracebackType
+from typing import Callable, Optional
+
+log = logging.getLogger(__name__)
+
+
+class PageCache:
+    COMMIT_INTERVAL = 20
+    """Number of stored pages after which they are committed, so an aborted conversion keeps most of its pages"""
+
+    def __init__(self, cache_file: Path, pdf_file: Path, page_extractor: Callable[[int], str]):
+        """
+        On-disk cache for the text extracted from each page of a PDF file.
+        The pages are stored zlib compressed in a SQLite database, keyed by the content hash of the PDF file, the
+        extractor of the page and the page index. Additionally, a fingerprint of each page is stored for each converted
+        PDF file, so unchanged pages of a new release of the PDF file can be taken from the previous conversion.
+
+        :param cache_file: SQLite database file of the cache
+        :param pdf_file: PDF file from which the pages are extracted
+        :param page_extractor: Function to get the identification of the extraction method (e.g. incl. the pypdf
+            version) of a page index, because another method might extract a different text and the pages of the
+            table of contents might use another method
+        """
+        self.cache_file: Path = cache_file
+        self.pdf_file: Path = pdf_file
+        self.pdf_hash: str = PageCache.file_hash(pdf_file)
+        self.page_extractor: Callable[[int], str] = page_extractor
+        self.connection: Optional[sqlite3.Connection] = None
+        self.uncommitted: int = 0
+
+    def __enter__(self):
+        """
+        Context manager: Open the database.
+        """
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.cache_file)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS pages (pdf_hash TEXT, extractor TEXT, page INTEGER, "
+                                "content BLOB, PRIMARY KEY (pdf_hash, extractor, page))")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS fingerprints (pdf_hash TEXT, page INTEGER, "
+                                "fingerprint TEXT, PRIMARY KEY (pdf_hash, page))")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS fingerprint_index ON fingerprints (fingerprint)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS conversions (pdf_hash TEXT PRIMARY KEY, pdf_file TEXT, "
+                                "converted REAL)")
+        self.uncommitted = 0
+        return self
+
+    def __exit__(self, exc_type: type[BaseException], exc_val: BaseException, exc_tb: TracebackType):
+        """
+        Context manager: Commit the stored pages and close the database.
+        """
+        self.connection.commit()
+        self.connection.close()
+        self.connection = None
+
+    @staticmethod
+    def file_hash(file: Path) -> str:
+        """
+        :param file: File to get the hash for
+        :return: SHA-256 hex digest of the file content
+        """
+        sha256 = hashlib.sha256()
+        with file.open("rb") as f:
+            while chunk := f.read(1024 * 1024):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def page_indexes(self) -> set[int]:
+        """
+        :return: Indexes of all pages of the PDF file which are cached for their extraction method
+        """
+        rows = self.connection.execute("SELECT page, extractor FROM pages WHERE pdf_hash = ?", (self.pdf_hash,))
+        return {page for page, extractor in rows if extractor == self.page_extractor(page)}
+
+    def get(self, index: int) -> Optional[str]:
+        """
+        :param index: Index of the page starting with 0
+        :return: Cached text of the page or None if the page is not cached
+        """
+        row = self.connection.execute("SELECT content FROM pages WHERE pdf_hash = ? AND extractor = ? AND page = ?",
+                                      (self.pdf_hash, self.page_extractor(index), index)).fetchone()
+        if row is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, index: int, content: str):
+        """
+        Store the text of a page.
+
+        :param index: Index of the page starting with 0
+        :param content: Extracted text of the page
+        """
+        self.connection.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                                (self.pdf_hash, self.page_extractor(index), index,
+                                 zlib.compress(content.encode("utf-8"), 9)))
+        self.uncommitted += 1
+        if self.uncommitted >= PageCache.COMMIT_INTERVAL:
+            self.connection.commit()
+            self.uncommitted = 0
+
+    def put_fingerprints(self, fingerprints: dict[int, str]):
+        """
+        Store the fingerprints of all pages and record the conversion of the PDF file.
+
+        :param fingerprints: Dictionary where the key is the page index and the value the fingerprint of the page
+        """
+        self.connection.execute("DELETE FROM fingerprints WHERE pdf_hash = ?", (self.pdf_hash,))
+        self.connection.executemany("INSERT INTO fingerprints VALUES (?, ?, ?)",
+                                    [(self.pdf_hash, index, fingerprint)
+                                     for index, fingerprint in fingerprints.items()])
+        self.connection.execute("INSERT OR REPLACE INTO conversions VALUES (?, ?, ?)",
+                                (self.pdf_hash, self.pdf_file.as_posix(), time.time()))
+        self.connection.commit()
+
+    def get_fingerprints(self, pdf_hash: str) -> dict[int, str]:
+        """
+        :param pdf_hash: Content hash of the converted PDF file
+        :return: Dictionary where the key is the page index and the value the fingerprint of the page
+        """
+        rows = self.connection.execute("SELECT page, fingerprint FROM fingerprints WHERE pdf_hash = ?", (pdf_hash,))
+        return {page: fingerprint for page, fingerprint in rows}
+
+    def previous_conversion(self) -> Optional[tuple[str, str]]:
+        """
+        :return: Tuple of content hash and path of the last converted PDF file other than the current one or None if
+            there is no such conversion
+        """
+        return self.connection.execute("SELECT pdf_hash, pdf_file FROM conversions WHERE pdf_hash != ? "
+                                       "ORDER BY converted DESC LIMIT 1", (self.pdf_hash,)).fetchone()
+
+    def get_by_fingerprint(self, fingerprint: str, index: int) -> Optional[str]:
+        """
+        Get the text of a page with the same fingerprint from any converted PDF file, which has been extracted with
+        the same method as the page.
+
+        :param fingerprint: Fingerprint of the page
+        :param index: Index of the page starting with 0
+        :return: Cached text of the page or None if there is no page with the same fingerprint
+        """
+        row = self.connection.execute("SELECT p.content FROM fingerprints f JOIN pages p "
+                                      "ON p.pdf_hash = f.pdf_hash AND p.page = f.page "
+                                      "WHERE f.fingerprint = ? AND p.extractor = ? LIMIT 1",
+                                      (fingerprint, self.page_extractor(index))).fetchone()
+        if row is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
@@ -0,0 +1,278 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+import difflib
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Optional
+
+log = logging.getLogger(__name__)
+
+
+class Hunk:
+    def __init__(self, page: str, line: int, before: list[str], old: list[str], new: list[str], after: list[str]):
+        """
+        Change of some consecutive lines of a page.
+
+        :param page: Label of the page containing the first old line, e.g. "Page 12"
+        :param line: Index of the first old line relative to the first line after the page marker
+        :param before: Unchanged lines before the old lines
+        :param old: Lines of the original text
+        :param new: Lines of the fixed text which replace the old lines
+        :param after: Unchanged lines after the old lines
+        """
+        self.page: str = page
+        self.line: int = line
+        self.before: list[str] = before
+        self.old: list[str] = old
+        self.new: list[str] = new
+        self.after: list[str] = after
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        :return: Dictionary to be encoded as JSON
+        """
+        return {"page": self.page, "line": self.line, "before": self.before, "old": self.old, "new": self.new,
+                "after": self.after}
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> 'Hunk':
+        """
+        :param data: Dictionary as returned by ``as_dict()``
+        :return: Hunk
+        """
+        return Hunk(data["page"], data["line"], data["before"], data["old"], data["new"], data["after"])
+
+    def __str__(self) -> str:
+        """
+        :return: Hunk formatted like a unified diff
+        """
+        lines = [f"@@ {self.page or 'Before the first page'}, line {self.line + 1} @@"]
+        lines.extend(f" {line}" for line in self.before)
+        lines.extend(f"-{line}" for line in self.old)
+        lines.extend(f"+{line}" for line in self.new)
+        lines.extend(f" {line}" for line in self.after)
+        return "\n".join(lines)
+
+
+class PatchSet:
+    PAGE_MARKER_PATTERN = re.compile(f"^{'<' * 20} (.+) {'>' * 20}$")
+    """Pattern to find the marker line of a page where group(1) is the page label, e.g. "Page 12" """
+    CONTEXT = 3
+    """Number of unchanged lines stored before and after the changed lines"""
+    MAX_FUZZ = 2
+    """Maximum number of unchanged lines which might be ignored at each side of a hunk (like "patch"), so at least one
+    unchanged line is left at each side"""
+    PAGE_SEARCH = 2
+    """Number of pages before and after the page of a hunk which are searched if the page has been moved"""
+
+    def __init__(self, hunks: Optional[list[Hunk]] = None):
+        """
+        Page-anchored patch set with the manual fixes of the converted text file. Each hunk is anchored to the label
+        of a page and to the line in the page, so the fixes can be replayed on the text file converted from a new
+        release of the PDF even if pages have been added or removed before.
+
+        :param hunks: Changes in the order of the text file
+        """
+        self.hunks: list[Hunk] = hunks or []
+
+    @staticmethod
+    def create(original: str, fixed: str) -> 'PatchSet':
+        """
+        Create the patch set with the changes from the original to the fixed text file.
+
+        :param original: Content of the original text file
+        :param fixed: Content of the manually fixed text file
+        :return: Patch set
+        """
+        old_lines = original.splitlines()
+        new_lines = fixed.splitlines()
+        pages = PatchSet.get_pages(old_lines)
+        hunks: list[Hunk] = []
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+        for group in matcher.get_grouped_opcodes(PatchSet.CONTEXT):
+            # Changes close to each other are grouped with the unchanged lines in between as in a unified diff
+            first = 1 if group[0][0] == "equal" else 0
+            last = len(group) - 1 if group[-1][0] == "equal" else len(group)
+            i1, j1 = group[first][1], group[first][3]
+            i2, j2 = group[last - 1][2], group[last - 1][4]
+            before = old_lines[group[0][1]:i1] if first else []
+            after = old_lines[i2:group[-1][2]] if last < len(group) else []
+            label, page_start, _ = pages[PatchSet.find_page(pages, i1)]
+            hunks.append(Hunk(label, i1 - page_start, before, old_lines[i1:i2], new_lines[j1:j2], after))
+        return PatchSet(hunks)
+
+    @staticmethod
+    def get_pages(lines: list[str]) -> list[tuple[str, int, int]]:
+        """
+        :param lines: Lines of the text file
+        :return: List of tuples with the label, the first line and the last line (exclusive) of each page, where the
+            first page with an empty label contains the lines before the first page marker
+        """
+        pages = [("", 0, 0)]
+        for line_no, line in enumerate(lines):
+            if m := PatchSet.PAGE_MARKER_PATTERN.match(line):
+                label, start, _ = pages[-1]
+                pages[-1] = (label, start, line_no)
+                pages.append((m.group(1), line_no + 1, line_no + 1))
+        label, start, _ = pages[-1]
+        pages[-1] = (label, start, len(lines))
+        return pages
+
+    @staticmethod
+    def find_page(pages: list[tuple[str, int, int]], line_no: int) -> int:
+        """
+        :param pages: Pages as returned by ``get_pages()``
+        :param line_no: Index of the line
+        :return: Index of the page containing the line
+        """
+        index = 0
+        for i, (_, start, _) in enumerate(pages):
+            if start > line_no:
+                break
+            index = i
+        return index
+
+    @staticmethod
+    def load(patch_set_file: Path) -> 'PatchSet':
+        """
+        :param patch_set_file: JSON file written by ``save()``
+        :return: Patch set
+        """
+        data = json.loads(patch_set_file.read_text(encoding="utf-8"))
+        return PatchSet([Hunk.from_dict(hunk) for hunk in data["hunks"]])
+
+    def save(self, patch_set_file: Path):
+        """
+        :param patch_set_file: JSON file to write
+        """
+        patch_set_file.parent.mkdir(parents=True, exist_ok=True)
+        data = {"context": PatchSet.CONTEXT, "hunks": [hunk.as_dict() for hunk in self.hunks]}
+        patch_set_file.write_text(json.dumps(data, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    def apply(self, original: str) -> tuple[str, list[Hunk]]:
+        """
+        Replay the patch set on an original text file. A hunk is searched near its line in its page and in the pages
+        before and after (if the text has been moved to another page). If the lines don't match exactly then first
+        whitespace differences are ignored and then up to ``MAX_FUZZ`` unchanged lines farthest away from the change
+        are ignored at each side (like the fuzz factor of "patch"). Hunks which are already applied are skipped.
+
+        :param original: Content of the original text file
+        :return: Tuple of the patched text and the hunks which couldn't be applied
+        """
+        lines = original.splitlines()
+        rejected: list[Hunk] = []
+        # Tuples of ignoring whitespace differences and the fuzz
+        steps = [(False, 0)] + [(True, fuzz) for fuzz in range(PatchSet.MAX_FUZZ + 1)]
+        for hunk in self.hunks:
+            for ignore_whitespace, fuzz in steps:
+                found = PatchSet.find_hunk(hunk, lines, fuzz, ignore_whitespace)
+                if found:
+                    break
+            else:
+                log.debug(f"Hunk not applied:\n{hunk}")
+                rejected.append(hunk)
+                continue
+            start, end, replacement = found
+            if ignore_whitespace:
+                log.debug(f"Hunk applied ignoring whitespace with fuzz {fuzz} at line {start + 1}:\n{hunk}")
+            lines[start:end] = replacement
+        return "\n".join(lines) + "\n", rejected
+
+    @staticmethod
+    def find_hunk(hunk: Hunk, lines: list[str], fuzz: int = 0,
+                  ignore_whitespace: bool = False) -> Optional[tuple[int, int, list[str]]]:
+        """
+        Find the location of a hunk. At least one unchanged line must be left at each side of the hunk. A hunk without
+        unchanged lines before (or after) the change must be located at the start (or the end) of the text file.
+        A hunk is only detected as already applied if all of its unchanged lines match.
+
+        :param hunk: Hunk to find
+        :param lines: Lines of the text file
+        :param fuzz: Number of unchanged lines to ignore at each side, where 0 means that all unchanged lines must match
+        :param ignore_whitespace: If True then whitespace differences are ignored
+        :return: Tuple of the first and the last (exclusive) line to replace and the replacement lines or None if the
+            hunk can't be found
+        """
+        before = hunk.before[fuzz:]
+        after = hunk.after[:len(hunk.after) - fuzz]
+        if (hunk.before and not before) or (hunk.after and not after):
+            # The change would not be anchored anymore at this side
+            return None
+        pages = PatchSet.get_pages(lines)
+        anchors = [i for i, (label, _, _) in enumerate(pages) if label == hunk.page]
+        if anchors:
+            anchor = anchors[0]
+            first_page = max(0, anchor - PatchSet.PAGE_SEARCH)
+            last_page = min(len(pages) - 1, anchor + PatchSet.PAGE_SEARCH)
+            expected = pages[anchor][1] + hunk.line - len(before)
+        else:
+            # The page doesn't exist anymore => Search everywhere
+            first_page = 0
+            last_page = len(pages) - 1
+            expected = 0
+        normalize = PatchSet.normalize if ignore_whitespace else lambda line: line
+        search_start = max(0, pages[first_page][1] - 1)
+        search_end = min(len(lines), pages[last_page][2] + 1)
+        normalized = [normalize(line) for line in lines[search_start:search_end]]
+        candidates = [(hunk.old, hunk.new)]
+        if not fuzz:
+            # With less unchanged lines a deletion would be detected as already applied almost anywhere
+            candidates.append((hunk.new, None))
+        for old, replacement in candidates:
+            pattern = [normalize(line) for line in before + old + after]
+            if not pattern:
+                # An empty pattern would match anywhere
+                continue
+            starts = range(search_start, search_end - len(pattern) + 1)
+            if not hunk.before:
+                # The hunk is at the start of the text file
+                starts = [start for start in starts if start == 0]
+            if not hunk.after:
+                # The hunk is at the end of the text file
+                starts = [start for start in starts if start + len(pattern) == len(lines)]
+            for start in sorted(starts, key=lambda start: abs(start - expected)):
+                if normalized[start - search_start:start - search_start + len(pattern)] == pattern:
+                    first = start + len(before)
+                    last = first + len(old)
+                    # If the hunk is already applied then the lines are kept
+                    return first, last, lines[first:last] if replacement is None else replacement
+        return None
+
+    @staticmethod
+    def normalize(line: str) -> str:
+        """
+        :param line: Line to normalize
+        :return: Line without leading and trailing whitespace and with single spaces between the words
+        """
+        return " ".join(line.split())
+
+    @staticmethod
+    def write_rejects(rejects_file: Path, rejected: list[Hunk]):
+        """
+        Write the hunks which couldn't be applied, so they can be resolved manually.
+
+        :param rejects_file: Text file to write
+        :param rejected: Hunks which couldn't be applied
+        """
+        rejects_file.parent.mkdir(parents=True, exist_ok=True)
+        with rejects_file.open("w", encoding="utf-8") as f:
+            for hunk in rejected:
+                f.write(f"{hunk}\n\n")
@@ -16,53 +16,90 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 ##############################################################################
+from bisect import bisect_right
+from collections import deque
 from pathlib import Path
 from types import TracebackType
 from typing import Optional, TextIO, Pattern
 
 
 class RewindReader:
-    def __init__(self, file: Path, encoding: str = 'utf-8', right_strip: str = "\n", page_no_pattern: Pattern = None):
+    def __init__(self, file: Path, encoding: str = 'utf-8', right_strip: str = "\n", page_no_pattern: Pattern = None,
+                 in_memory: bool = True, history_size: int = 16, toc_page_pattern: Pattern = None):
         """
         File reader which provides methods to rewind the file pointer to the beginning of the just read line.
+        By default, the whole file is loaded into a list of lines, so the position is just the index of the next line
+        and rewinding or looking ahead doesn't need to seek in the file. ``tell()`` of a file opened in text mode is
+        quite slow, because it must reconstruct the state of the decoder.
+        For a file loaded into memory the lines with the page number are searched only once when the file is opened,
+        so the page number of any line can be looked up without matching the page_no_pattern again.
 
         :param file: Text file to read
         :param encoding: File encoding to be used
         :param right_strip: If set then from the read line all characters at the end matching right_strip will be removed
         :param page_no_pattern: If specified then each line matching this pattern is ignored and the group(1) is extracted
             as the page number
+        :param in_memory: If True then the file is loaded into memory, otherwise it's read line by line from the file
+        :param history_size: Maximum number of read lines which can be rewound
+        :param toc_page_pattern: If specified then the lines with a page number matching this pattern are pages of the
+            table of contents, which are numbered separately and therefore can't be sought by ``seek_to_page()``
         """
         self.file: Path = file
         self.encoding: str = encoding
         self.right_strip: str = right_strip
         self.page_no_pattern: Pattern = page_no_pattern
+        self.toc_page_pattern: Pattern = toc_page_pattern
+        self.in_memory: bool = in_memory
         self.handle: Optional[TextIO] = None
-        self.pos_last_line: int = 0
+        self.lines: Optional[list[str]] = None
+        self.line_index: int = 0
+        self.page_lines: list[int] = []
+        """Sorted indexes of the lines with a page number if the file is loaded into memory"""
+        self.page_numbers: list[int] = []
+        """Page numbers of the lines in page_lines"""
+        self.page_starts: dict[int, int] = {}
+        """Dictionary where the key is the page number and the value the index of the first line with this page
+        number after the last page of the table of contents"""
+        self.page_markers: Optional[dict[int, int]] = None
+        """Dictionary where the key is the index of a line with a page number and the value the page number or None if
+        the file is not loaded into memory"""
+        self.history: deque[tuple[int, int, int]] = deque(maxlen=history_size)
         self.line_no: int = 0
         self.line_inc: int = 1
         self.page_no: int = 0
-        self.rewind_enabled: bool = False
 
     def __enter__(self):
         """
         Context manager: Open the file and initialize the pointers.
         """
         self.handle = self.file.open(encoding=self.encoding)
+        if self.in_memory:
+            # Use readlines() to split the lines exactly the same way as readline()
+            self.lines = self.handle.readlines()
+            self.handle.close()
+            self.handle = None
+            self.build_page_index()
+        self.line_index = 0
         self.line_no = 0
         self.line_inc = 1
         self.page_no = 0
-        self.pos_last_line = self.handle.tell()
+        self.history.clear()
         return self
 
     def __exit__(self, exc_type: type[BaseException], exc_val: BaseException, exc_tb: TracebackType):
         """
         Context manager: Close the file.
         """
-        self.handle.close()
+        if self.handle:
+            self.handle.close()
+            self.handle = None
+        self.lines = None
+        self.page_markers = None
+        self.line_index = 0
         self.line_no = 0
         self.line_inc = 1
         self.page_no = 0
-        self.pos_last_line = 0
+        self.history.clear()
 
     def __iter__(self):
         """
@@ -76,17 +113,82 @@ class RewindReader:
 
         :return: Line read
         """
-        # Remember the current position
-        self.pos_last_line = self.handle.tell()
-        line = self.readline()
-        self.line_no += self.line_inc
-        self.line_inc = 1
-        # Check for lines like "<<<<<<<<<<<<<<<<<<<< Page 259 >>>>>>>>>>>>>>>>>>>>"
+        # Remember the current state, so it can be restored by rewind()
+        self.history.append((self.tell(), self.line_no, self.page_no))
+        try:
+            while True:
+                line = self.readline()
+                self.line_no += self.line_inc
+                self.line_inc = 1
+                page_no = self.page_marker(line)
+                if page_no is None:
+                    return line
+                self.page_no = page_no
+        except StopIteration:
+            self.history.pop()
+            raise
+
+    def build_page_index(self):
+        """
+        Search all lines with a page number in the lines loaded into memory.
+        """
+        self.page_lines = []
+        self.page_numbers = []
+        self.page_markers = {}
+        self.page_starts = {}
+        if self.page_no_pattern:
+            for index, line in enumerate(self.lines):
+                if m := self.page_no_pattern.match(line):
+                    self.page_lines.append(index)
+                    self.page_numbers.append(int(m.group(1)))
+            self.page_markers = dict(zip(self.page_lines, self.page_numbers))
+            for index, page_no in zip(self.page_lines, self.page_numbers):
+                if self.toc_page_pattern and self.toc_page_pattern.match(self.lines[index]):
+                    # The page numbers of the table of contents collide with the page numbers of the content
+                    self.page_starts = {}
+                else:
+                    self.page_starts.setdefault(page_no, index)
+
+    def page_marker(self, line: str) -> Optional[int]:
+        """
+        Check if the just read line is a line like "<<<<<<<<<<<<<<<<<<<< Page 259 >>>>>>>>>>>>>>>>>>>>".
+
+        :param line: Just read line
+        :return: Page number or None if the line doesn't contain a page number
+        """
+        if self.page_markers is not None:
+            return self.page_markers.get(self.line_index - 1)
         if self.page_no_pattern and (m := self.page_no_pattern.match(line)):
-            self.page_no = int(m.group(1))
-            line = self.__next__()
-        self.rewind_enabled = True
-        return line
+            return int(m.group(1))
+        return None
+
+    def get_page_no(self, index: int) -> int:
+        """
+        This is only supported if the file is loaded into memory.
+
+        :param index: Index of the line starting with 0
+        :return: Page number of the line or 0 if the line is before the first line with a page number
+        """
+        i = bisect_right(self.page_lines, index) - 1
+        return self.page_numbers[i] if i >= 0 else 0
+
+    def seek_to_page(self, page_no: int):
+        """
+        Set the current position before the first line with the specified page number, so the next read line is the
+        first line of this page. This is only supported if the file is loaded into memory.
+
+        :param page_no: Page number to seek to
+        """
+        if self.page_markers is None:
+            raise IOError("Seeking to a page is only supported if the file is loaded into memory")
+        if page_no not in self.page_starts:
+            raise ValueError(f"Page {page_no} not found in {self.file}")
+        index = self.page_starts[page_no]
+        self.seek(index)
+        self.line_no = index
+        self.line_inc = 1
+        self.page_no = self.get_page_no(index - 1)
+        self.history.clear()
 
     def readline(self) -> str:
         """
@@ -95,33 +197,83 @@ class RewindReader:
 
         :return: Next line
         """
-        line = self.handle.readline()
-        if line == "":
-            raise StopIteration
+        if self.lines is not None:
+            if self.line_index >= len(self.lines):
+                raise StopIteration
+            line = self.lines[self.line_index]
+            self.line_index += 1
+        else:
+            line = self.handle.readline()
+            if line == "":
+                raise StopIteration
         if self.right_strip:
             line = line.rstrip(self.right_strip)
         return line
 
+    def tell(self) -> int:
+        """
+        This will not update any internal line counters!
+
+        :return: Current position, which is the index of the next line if the file is loaded into memory or the opaque
+            file position otherwise
+        """
+        if self.lines is not None:
+            return self.line_index
+        return self.handle.tell()
+
+    def seek(self, pos: int):
+        """
+        Set the current position. This will not update any internal line counters!
+
+        :param pos: Position as returned by ``tell()``
+        """
+        if self.lines is not None:
+            self.line_index = pos
+        else:
+            self.handle.seek(pos)
+
     def reset(self):
         """
         Rollback to the beginning of the file.
         """
-        self.handle.seek(0)
+        self.seek(0)
         self.line_no = 0
         self.line_inc = 1
         self.page_no = 0
-        self.pos_last_line = 0
+        self.history.clear()
 
-    def rewind(self):
+    def rewind(self, n: int = 1):
         """
-        Rollback the file pointer before the last read line.
+        Rollback the file pointer before the last n read lines. The line and page numbers are restored as well.
+
+        :param n: Number of read lines to rollback, which is limited by the history size
         """
-        if self.rewind_enabled:
-            self.handle.seek(self.pos_last_line)
-            self.line_no -= 1
-            self.rewind_enabled = False
-        else:
-            raise IOError("Rollback is only supported for the last read line")
+        if n > len(self.history):
+            raise IOError(f"Rollback is only supported for the last {len(self.history)} read lines")
+        for _ in range(n - 1):
+            self.history.pop()
+        pos, self.line_no, self.page_no = self.history.pop()
+        self.seek(pos)
+
+    def peek(self, n: int = 1) -> list[str]:
+        """
+        Get the next lines without changing the current position. Like for the iterator the lines with the page number
+        are skipped.
+
+        :param n: Number of lines to get
+        :return: Next n lines, which are less at the end of the file
+        """
+        pos = self.tell()
+        lines: list[str] = []
+        try:
+            while len(lines) < n:
+                line = self.readline()
+                if self.page_marker(line) is None:
+                    lines.append(line)
+        except StopIteration:
+            pass
+        self.seek(pos)
+        return lines
 
     def location(self) -> str:
         """
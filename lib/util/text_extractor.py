@@ -0,0 +1,129 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+from abc import ABC, abstractmethod
+from typing import Any
+
+import pypdf
+from pypdf import PageObject
+from pypdf._text_extraction import _layout_mode
+from pypdf.generic import ContentStream
+
+
+class TextExtractor(ABC):
+    NAME = ""
+    """Name of the text extractor in the *.ini file"""
+
+    @abstractmethod
+    def extract(self, page: PageObject) -> str:
+        """
+        Extract the text of a page.
+
+        :param page: Page read from PdfReader
+        :return: Extracted text of the page
+        """
+
+    def identifier(self) -> str:
+        """
+        :return: Identification of the extraction method for the page cache (incl. the pypdf version), because another
+            method might extract a different text
+        """
+        return f"pypdf {pypdf.__version__} {self.NAME}"
+
+    @staticmethod
+    def create(name: str) -> 'TextExtractor':
+        """
+        Create the text extractor configured in the *.ini file.
+
+        :param name: Name of the text extractor, see ``NAME`` of the subclasses
+        :return: Text extractor
+        """
+        match name:
+            case LayoutTextExtractor.NAME:
+                return LayoutTextExtractor()
+            case EstimatedLayoutTextExtractor.NAME:
+                return EstimatedLayoutTextExtractor()
+            case PlainTextExtractor.NAME:
+                return PlainTextExtractor()
+            case _:
+                raise ValueError(f"Unknown text extractor {name} (expected {LayoutTextExtractor.NAME}, "
+                                 f"{EstimatedLayoutTextExtractor.NAME} or {PlainTextExtractor.NAME})")
+
+
+class LayoutTextExtractor(TextExtractor):
+    NAME = "layout"
+    FIXED_CHAR_WIDTH = 200.0
+    """Character width for converting the text to a fixed-width layout"""
+
+    def extract(self, page: PageObject) -> str:
+        """
+        Extract the text of a page like the "layout" mode of ``PageObject.extract_text()``, but with a fixed character
+        width. pypdf estimates the character width from the rendered text, which raises a ZeroDivisionError for some
+        pages of the KSP manuals. Therefore, the steps of the layout mode are called here instead of patching pypdf.
+
+        :param page: Page read from PdfReader
+        :return: Extracted text of the page
+        """
+        if "/Contents" not in page:
+            return ""
+        fonts = page._layout_mode_fonts()
+        ops = iter(ContentStream(page["/Contents"].get_object(), page.pdf, "bytes").operations)
+        bt_groups = _layout_mode.text_show_operations(ops, fonts, True, None)
+        if not bt_groups:
+            return ""
+        ty_groups = _layout_mode.y_coordinate_groups(bt_groups, None)
+        char_width = self.char_width(bt_groups)
+        return _layout_mode.fixed_width_page(ty_groups, char_width, True, 1)
+
+    def char_width(self, bt_groups: list[dict[str, Any]]) -> float:
+        """
+        :param bt_groups: Text rendered by each BT operator of the page
+        :return: Character width for converting the text to a fixed-width layout
+        """
+        return LayoutTextExtractor.FIXED_CHAR_WIDTH
+
+
+class EstimatedLayoutTextExtractor(LayoutTextExtractor):
+    NAME = "layout_estimated"
+
+    def char_width(self, bt_groups: list[dict[str, Any]]) -> float:
+        """
+        Use the character width estimated by pypdf, so the columns are closer to the rendered page. The fixed character
+        width is only used for pages where pypdf can't estimate it.
+
+        :param bt_groups: Text rendered by each BT operator of the page
+        :return: Character width for converting the text to a fixed-width layout
+        """
+        try:
+            return _layout_mode.fixed_char_width(bt_groups)
+        except ZeroDivisionError:
+            return LayoutTextExtractor.FIXED_CHAR_WIDTH
+
+
+class PlainTextExtractor(TextExtractor):
+    NAME = "plain"
+
+    def extract(self, page: PageObject) -> str:
+        """
+        Extract the text of a page in the "plain" mode of ``PageObject.extract_text()``, which is much faster than the
+        layout mode, but doesn't keep the columns of the page.
+
+        :param page: Page read from PdfReader
+        :return: Extracted text of the page
+        """
+        return page.extract_text()
@@ -0,0 +1,28 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+"""Shared pytest configuration which makes the lib folder importable like find_lib does for the scripts"""
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+"""Root directory of the repository"""
+# Add the lib directory to the search path
+sys.path.append(f"{ROOT_DIR.as_posix()}/lib")
+# Add the helpers shared with the compiler wrapper to the search path
+sys.path.append(f"{ROOT_DIR.as_posix()}/vscode_extension/bin")
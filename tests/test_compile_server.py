@@ -0,0 +1,78 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+import io
+import queue
+from pathlib import Path
+
+import pytest
+
+from _compile_job import create_argument_parser
+from _compile_server import CompileServer
+
+
+def test_is_loopback():
+    assert CompileServer.is_loopback("127.0.0.1")
+    assert CompileServer.is_loopback("localhost")
+    assert not CompileServer.is_loopback("0.0.0.0")
+
+
+def test_serve_socket_rejects_other_hosts():
+    with pytest.raises(ValueError):
+        CompileServer().serve_socket("0.0.0.0", 0)
+
+
+def test_check_paths(tmp_path: Path):
+    source_file = (tmp_path / "script.ksp").as_posix()
+    parser = create_argument_parser()
+    assert CompileServer.check_paths(parser.parse_args([source_file, (tmp_path / "out" / "script.txt").as_posix()])) \
+        == ""
+    assert CompileServer.check_paths(parser.parse_args([source_file, (tmp_path.parent / "script.txt").as_posix()]))
+    assert CompileServer.check_paths(parser.parse_args(["--profile", "/tmp/ksp.prof", source_file]))
+    # A script sent with the request can't write any file
+    assert CompileServer.check_paths(parser.parse_args(["-", (tmp_path / "script.txt").as_posix()]))
+    assert CompileServer.check_paths(parser.parse_args(["-"])) == ""
+
+
+def test_compile_restricted_paths(tmp_path: Path):
+    server = CompileServer()
+    server.restrict_paths = True
+    response = server.compile([(tmp_path / "script.ksp").as_posix(), (tmp_path.parent / "script.txt").as_posix()], "")
+    assert response["exit_code"] == -1
+    assert "must be in the directory" in response["stderr"]
+
+
+def test_invalid_token():
+    server = CompileServer()
+    server.token = "secret"
+    in_stream = io.StringIO('{"id": 1, "token": "guess", "command": "ping"}\n{"id": 2, "token": "secret", '
+                            '"command": "ping"}\n')
+    out_stream = io.StringIO()
+    requests: queue.Queue = queue.Queue()
+    server.read_requests(in_stream, out_stream, requests)
+    # The connection is closed after the first request with an invalid token
+    assert out_stream.getvalue() == '{"id":1,"exit_code":-1,"stderr":"Invalid token\\n"}\n'
+    assert requests.get_nowait() is None
+
+
+def test_valid_token():
+    server = CompileServer()
+    server.token = "secret"
+    out_stream = io.StringIO()
+    server.serve_stream(io.StringIO('{"id": 1, "token": "secret", "command": "ping"}\n'), out_stream)
+    assert out_stream.getvalue() == '{"id":1,"exit_code":0}\n'
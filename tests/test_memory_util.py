@@ -0,0 +1,32 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+import inspect
+
+import _memory_util
+from util import memory_util
+
+
+def test_copies_in_sync():
+    # The extension ships vscode_extension/bin without lib, so it has its own copy
+    assert inspect.getsource(_memory_util.peak_rss_kib) == inspect.getsource(memory_util.peak_rss_kib)
+
+
+def test_peak_rss_kib():
+    peak_rss = memory_util.peak_rss_kib()
+    assert peak_rss is None or peak_rss > 0
@@ -0,0 +1,47 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+from pathlib import Path
+
+from util.page_cache import PageCache
+
+
+def page_extractor(page_offset: int):
+    """
+    :param page_offset: Number of pages of the table of contents
+    :return: Function to get the extractor of a page like MainParser.extractor_identifier()
+    """
+    return lambda index: "toc" if index < page_offset else "body"
+
+
+def test_page_offset_changed(tmp_path: Path):
+    cache_file = tmp_path / "page_cache.sqlite"
+    pdf_file = tmp_path / "manual.pdf"
+    pdf_file.write_bytes(b"%PDF")
+    with PageCache(cache_file, pdf_file, page_extractor(2)) as cache:
+        for index in range(3):
+            cache.put(index, f"Page {index}")
+        cache.put_fingerprints({0: "a", 1: "b", 2: "c"})
+        assert cache.page_indexes() == {0, 1, 2}
+    # Page 1 is now extracted with the extractor of the other pages, so its cached text can't be used
+    with PageCache(cache_file, pdf_file, page_extractor(1)) as cache:
+        assert cache.page_indexes() == {0, 2}
+        assert cache.get(0) == "Page 0"
+        assert cache.get(1) is None
+        assert cache.get_by_fingerprint("b", 1) is None
+        assert cache.get_by_fingerprint("c", 2) == "Page 2"
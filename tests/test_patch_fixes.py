@@ -0,0 +1,52 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+from pathlib import Path
+
+import pytest
+
+from util.patch_set import PatchSet
+
+TXT_DIR = Path(__file__).parent.parent / "doc_parser" / "txt"
+"""Directory with the converted text files of the KSP manuals"""
+
+
+def read_txt(version: str, kind: str) -> str:
+    """
+    :param version: Kontakt version of the manual, e.g. "8_1"
+    :param kind: "Original" or "Fixed"
+    :return: Content of the text file
+    """
+    return (TXT_DIR / f"ksp_{version}" / f"KSP_Reference_Manual_{kind}.txt.py").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("version", ["8_1", "7_10", "7_8"])
+def test_round_trip(version: str):
+    original = read_txt(version, "Original")
+    fixed = read_txt(version, "Fixed")
+    patch_set = PatchSet.create(original, fixed)
+    assert patch_set.apply(original) == (fixed, [])
+    # Replaying the patch set again doesn't change anything
+    assert patch_set.apply(fixed) == (fixed, [])
+
+
+def test_apply_to_next_version():
+    patch_set = PatchSet.create(read_txt("7_8", "Original"), read_txt("7_8", "Fixed"))
+    _, rejected = patch_set.apply(read_txt("7_10", "Original"))
+    assert len(patch_set.hunks) == 231
+    assert len(patch_set.hunks) - len(rejected) == 214
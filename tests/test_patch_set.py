@@ -0,0 +1,123 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+from util.patch_set import Hunk, PatchSet
+
+MARKER = f"{'<' * 20} Page %d {'>' * 20}"
+"""Format of a page marker line of the converted text file"""
+
+
+def make_text(*pages: list[str]) -> str:
+    """
+    :param pages: Lines of each page
+    :return: Text file content with a page marker before each page
+    """
+    lines = []
+    for page_no, page in enumerate(pages, start=1):
+        lines.append(MARKER % page_no)
+        lines.extend(page)
+    return "\n".join(lines) + "\n"
+
+
+PAGE_1 = ["Callbacks", "", "on init", "  declare $a", "end on", "", "Remarks", "Some text"]
+PAGE_2 = ["on note", "  message($a)", "end on", "", "Examples", "  play_note(60, 100, 0, -1)", "See Also", "end"]
+ORIGINAL = make_text(PAGE_1, PAGE_2)
+FIXED = make_text(PAGE_1, ["on note", "  message($a)", "end on", "", "Example", "  play_note(60, 100, 0, -1)",
+                           "See Also", "end"])
+
+
+def test_create():
+    patch_set = PatchSet.create(ORIGINAL, FIXED)
+    assert len(patch_set.hunks) == 1
+    hunk = patch_set.hunks[0]
+    assert hunk.page == "Page 2"
+    assert hunk.line == 4
+    assert hunk.before == ["  message($a)", "end on", ""]
+    assert hunk.old == ["Examples"]
+    assert hunk.new == ["Example"]
+    assert hunk.after == ["  play_note(60, 100, 0, -1)", "See Also", "end"]
+
+
+def test_save_and_load(tmp_path):
+    patch_set_file = tmp_path / "fixes.json"
+    PatchSet.create(ORIGINAL, FIXED).save(patch_set_file)
+    patch_set = PatchSet.load(patch_set_file)
+    assert patch_set.apply(ORIGINAL) == (FIXED, [])
+
+
+def test_apply_moved_page():
+    # A page has been inserted before, so the hunk is found on the next page
+    original = make_text(["New page"], PAGE_1, PAGE_2)
+    fixed, rejected = PatchSet.create(ORIGINAL, FIXED).apply(original)
+    assert rejected == []
+    assert fixed == MARKER % 1 + "\nNew page\n" + FIXED.replace("Page 2", "Page 3").replace("Page 1", "Page 2")
+
+
+def test_apply_already_applied():
+    assert PatchSet.create(ORIGINAL, FIXED).apply(FIXED) == (FIXED, [])
+
+
+def test_apply_ignoring_whitespace():
+    original = ORIGINAL.replace("  play_note(60, 100, 0, -1)", "play_note(60,  100, 0, -1) ")
+    fixed, rejected = PatchSet.create(ORIGINAL, FIXED).apply(original)
+    assert rejected == []
+    assert "Example\nplay_note(60,  100, 0, -1) \n" in fixed
+
+
+def test_apply_with_fuzz():
+    # The unchanged lines farthest away from the change are ignored
+    original = ORIGINAL.replace("  message($a)", "  message($b)").replace("See Also\nend", "See Also\nend on")
+    fixed, rejected = PatchSet.create(ORIGINAL, FIXED).apply(original)
+    assert rejected == []
+    assert fixed == FIXED.replace("  message($a)", "  message($b)").replace("See Also\nend", "See Also\nend on")
+
+
+def test_reject_changed_context():
+    # Fuzz 2 is the maximum, so the unchanged line next to the change must match
+    original = ORIGINAL.replace("end on\n\nExamples", "end on\n-\nExamples")
+    patch_set = PatchSet.create(ORIGINAL, FIXED)
+    assert patch_set.apply(original) == (original, patch_set.hunks)
+
+
+def test_reject_missing_deletion():
+    # The deleted lines are gone but the unchanged lines differ as well => Not reported as already applied
+    hunk = Hunk("Page 2", 4, ["  message($a)", "end on", ""], ["Examples"], [],
+                ["  play_note(60, 100, 0, -1)", "See Also", "end"])
+    original = make_text(PAGE_1, ["on note", "  message($b)", "end on", "", "  play_note(60, 100, 0, -1)",
+                                  "See Also", "end"])
+    assert PatchSet([hunk]).apply(original) == (original, [hunk])
+
+
+def test_reject_blank_line_deletion():
+    # The deletion of a blank line is not applied to an unrelated blank line
+    hunk = Hunk("Page 2", 3, ["on note", "  message($a)", "end on"], [""], [],
+                ["Examples", "  play_note(60, 100, 0, -1)", "See Also"])
+    original = make_text(PAGE_1, ["Something else", "", "entirely"])
+    assert PatchSet([hunk]).apply(original) == (original, [hunk])
+
+
+def test_apply_at_start_and_end():
+    original = "".join(f"line {i}\n" for i in range(10))
+    fixed = original.replace("line 0", "first").replace("line 9", "last")
+    patch_set = PatchSet.create(original, fixed)
+    assert [(hunk.before, hunk.after) for hunk in patch_set.hunks] == [([], ["line 1", "line 2", "line 3"]),
+                                                                      (["line 6", "line 7", "line 8"], [])]
+    assert patch_set.apply(original) == (fixed, [])
+    # Without unchanged lines at a side the hunk must be at the start or the end of the text file
+    shifted = "zero\n" + original + "after\n"
+    assert patch_set.apply(shifted) == (shifted, patch_set.hunks)
@@ -0,0 +1,140 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+import re
+from pathlib import Path
+
+import pytest
+
+from util.rewind_reader import RewindReader
+
+PAGE_PATTERN = re.compile(f"{'<' * 20} (?:Table of Contents )?Page (\\d+) {'>' * 20}")
+"""Pattern to find a page number like MainParser.PAGE_PATTERN"""
+TOC_PAGE_PATTERN = re.compile(f"{'<' * 20} Table of Contents Page \\d+ {'>' * 20}")
+"""Pattern to find a page number of the table of contents like MainParser.TOC_PAGE_PATTERN"""
+LINES = [
+    f"{'<' * 20} Table of Contents Page 1 {'>' * 20}",
+    "Contents",
+    f"{'<' * 20} Table of Contents Page 2 {'>' * 20}",
+    "1. Callbacks ..... 2",
+    f"{'<' * 20} Page 1 {'>' * 20}",
+    "Title",
+    f"{'<' * 20} Page 2 {'>' * 20}",
+    "1. Callbacks",
+    "on init",
+    f"{'<' * 20} Page 3 {'>' * 20}",
+    "end on",
+    f"{'<' * 20} Page 4 {'>' * 20}",
+    "Wrong page number",
+    f"{'<' * 20} Page 3 {'>' * 20}",
+    "Last line",
+]
+"""Text file with table of contents pages and a duplicate page number"""
+
+
+@pytest.fixture
+def txt_file(tmp_path: Path) -> Path:
+    """
+    :param tmp_path: Temporary directory of the test
+    :return: Text file with the LINES
+    """
+    file = tmp_path / "manual.txt"
+    file.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    return file
+
+
+def test_seek_to_page_after_toc(txt_file: Path):
+    with RewindReader(txt_file, page_no_pattern=PAGE_PATTERN, toc_page_pattern=TOC_PAGE_PATTERN) as reader:
+        # The page numbers of the table of contents are not used for seeking
+        assert reader.page_starts == {1: 4, 2: 6, 3: 9, 4: 11}
+        reader.seek_to_page(2)
+        assert next(reader) == "1. Callbacks"
+        assert reader.page_no == 2
+        # The first page with a duplicate page number is used
+        reader.seek_to_page(3)
+        assert next(reader) == "end on"
+        assert (reader.page_no, reader.line_no) == (3, 11)
+
+
+def test_seek_to_page_without_toc_pattern(txt_file: Path):
+    with RewindReader(txt_file, page_no_pattern=PAGE_PATTERN) as reader:
+        reader.seek_to_page(2)
+        assert next(reader) == "1. Callbacks ..... 2"
+
+
+@pytest.mark.parametrize("in_memory", [True, False])
+def test_iterate(txt_file: Path, in_memory: bool):
+    with RewindReader(txt_file, page_no_pattern=PAGE_PATTERN, in_memory=in_memory) as reader:
+        lines = [(line, reader.page_no, reader.line_no) for line in reader]
+    # The lines with the page number are skipped, but counted
+    assert lines[:3] == [("Contents", 1, 2), ("1. Callbacks ..... 2", 2, 4), ("Title", 1, 6)]
+    assert lines[-1] == ("Last line", 3, 15)
+    assert len(lines) == 8
+
+
+@pytest.mark.parametrize("in_memory", [True, False])
+def test_peek(txt_file: Path, in_memory: bool):
+    with RewindReader(txt_file, page_no_pattern=PAGE_PATTERN, in_memory=in_memory) as reader:
+        for line in reader:
+            if line == "on init":
+                break
+        # The lines with the page number are skipped and the position is kept
+        assert reader.peek(2) == ["end on", "Wrong page number"]
+        assert reader.peek(10) == ["end on", "Wrong page number", "Last line"]
+        assert next(reader) == "end on"
+        assert reader.peek(5) == ["Wrong page number", "Last line"]
+        assert (reader.page_no, reader.line_no) == (3, 11)
+
+
+@pytest.mark.parametrize("in_memory", [True, False])
+def test_rewind(txt_file: Path, in_memory: bool):
+    with RewindReader(txt_file, page_no_pattern=PAGE_PATTERN, in_memory=in_memory, history_size=3) as reader:
+        for line in reader:
+            if line == "end on":
+                break
+        assert (reader.page_no, reader.line_no) == (3, 11)
+        reader.rewind()
+        assert next(reader) == "end on"
+        # The page and line numbers are restored as well
+        reader.rewind(3)
+        assert (reader.page_no, reader.line_no) == (1, 6)
+        assert [next(reader) for _ in range(3)] == ["1. Callbacks", "on init", "end on"]
+        assert (reader.page_no, reader.line_no) == (3, 11)
+        # Only the last history_size lines can be rewound
+        with pytest.raises(IOError):
+            reader.rewind(4)
+
+
+def test_seek_to_page(txt_file: Path):
+    with RewindReader(txt_file, page_no_pattern=PAGE_PATTERN, toc_page_pattern=TOC_PAGE_PATTERN) as reader:
+        next(reader)
+        reader.seek_to_page(4)
+        assert (reader.page_no, reader.line_no) == (3, 11)
+        assert next(reader) == "Wrong page number"
+        assert (reader.page_no, reader.line_no) == (4, 13)
+        # The history is cleared, so it's not possible to rewind before the page
+        with pytest.raises(IOError):
+            reader.rewind(2)
+        with pytest.raises(ValueError):
+            reader.seek_to_page(5)
+
+
+def test_seek_to_page_not_in_memory(txt_file: Path):
+    with RewindReader(txt_file, page_no_pattern=PAGE_PATTERN, in_memory=False) as reader:
+        with pytest.raises(IOError):
+            reader.seek_to_page(1)
@@ -0,0 +1,84 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+from configparser import ConfigParser
+from pathlib import Path
+
+import pytest
+
+from config.constants import ItemType
+from config.system_config import Singleton, SystemConfig
+from manual_parser.item_parser import ItemParser
+from manual_parser.main_parser import MainParser
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+"""Root directory of the repository"""
+
+
+@pytest.fixture
+def ini_file(tmp_path: Path) -> Path:
+    """
+    Configuration of the KSP 8.1 manual which writes the *.csv files and logs into a temporary directory.
+
+    :param tmp_path: Temporary directory of the test
+    :return: Path to the *.ini file
+    """
+    config = ConfigParser(interpolation=None)
+    config.read(ROOT_DIR / "cfg" / "ksp_8_1" / "system.ini")
+    config["General"]["root_dir"] = ROOT_DIR.as_posix()
+    config["General"]["log_dir"] = (tmp_path / "logs").as_posix()
+    config["General"]["csv_dir"] = (tmp_path / "csv").as_posix()
+    config["General"]["ts_dir"] = (tmp_path / "generated").as_posix()
+    file = tmp_path / "system.ini"
+    with file.open("w", encoding="utf-8") as f:
+        config.write(f)
+    # The configuration is a singleton => Drop the one of the previous test
+    Singleton._instances.pop(SystemConfig, None)
+    yield file
+    Singleton._instances.pop(SystemConfig, None)
+
+
+def parse_and_compare(ini_file: Path, jobs: int):
+    """
+    Parse the KSP 8.1 manual and compare the *.csv files with the checked in ones.
+
+    :param ini_file: Path to the *.ini file
+    :param jobs: Number of worker processes
+    """
+    SystemConfig(ini_file, init_logging=False)
+    MainParser.get_parser(ItemType.MAIN).parse(jobs)
+    csv_files = sorted(SystemConfig().csv_dir.glob("*.csv"))
+    assert [csv_file.name for csv_file in csv_files] == ["built_in_callbacks.csv", "built_in_commands.csv",
+                                                         "built_in_functions.csv", "built_in_variables.csv",
+                                                         "built_in_widgets.csv"]
+    for csv_file in csv_files:
+        expected = ROOT_DIR / "doc_parser" / "csv" / "ksp_8_1" / csv_file.name
+        # The checked in *.csv files might have been converted to other line endings
+        assert csv_file.read_bytes().replace(b"\r", b"") == expected.read_bytes().replace(b"\r", b""), csv_file.name
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse(ini_file: Path, jobs: int):
+    parse_and_compare(ini_file, jobs)
+
+
+def test_parse_wrong_content_page(ini_file: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture):
+    # None of the contents starts on page 5 => The whole file must be parsed
+    monkeypatch.setattr(ItemParser, "get_content_pages", lambda self: [5])
+    parse_and_compare(ini_file, 1)
+    assert "not found on page 5 from the TOC" in caplog.text
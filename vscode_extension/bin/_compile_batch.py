@@ -0,0 +1,222 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+"""Compile many KSP scripts with a pool of worker processes"""
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Optional
+
+from _compile_cache import CompileCache
+from _compile_job import CompileJob, CompileResult
+
+# Cache of the worker process
+_worker_cache: Optional[CompileCache] = None
+
+
+def _init_worker(cache_dir: Optional[Path], cache_size: int):
+    """
+    Initialize a worker process.
+
+    :param cache_dir: Directory of the compile cache or None if no cache is used
+    :param cache_size: Maximum size of the compile cache in bytes
+    """
+    global _worker_cache
+    if cache_dir:
+        _worker_cache = CompileCache(cache_dir, cache_size)
+
+
+def _compile(args: list[str]) -> tuple[dict[str, Any], float]:
+    """
+    Compile a single script in a worker process.
+
+    :param args: Compiler options inclusive input and output file
+    :return: Tuple of the compile result as dictionary and the compile time in seconds
+    """
+    start = time.perf_counter()
+    result = CompileJob(args, _worker_cache).run()
+    return result.as_dict(), time.perf_counter() - start
+
+
+class BatchCompiler:
+    SEPARATOR = "==>"
+    """Separator between input and output file in a list file"""
+
+    def __init__(self, compiler_args: list[str], file_pairs: list[tuple[str, Optional[str]]], jobs: int = 0,
+                 cache_dir: Optional[Path] = None, cache_size: int = 64 * 1024 * 1024):
+        """
+        Compile many KSP scripts with a pool of worker processes, so the interpreter start and the import of the
+        compiler are only paid once per worker.
+
+        :param compiler_args: Compiler options used for all scripts (without input and output file)
+        :param file_pairs: List of tuples with the input file and the output file (or None)
+        :param jobs: Number of worker processes or 0 to use the number of CPUs
+        :param cache_dir: Directory of the compile cache or None if no cache is used
+        :param cache_size: Maximum size of the compile cache in bytes
+        """
+        self.compiler_args: list[str] = compiler_args
+        self.file_pairs: list[tuple[str, Optional[str]]] = file_pairs
+        self.jobs: int = jobs or os.cpu_count() or 1
+        self.cache_dir: Optional[Path] = cache_dir
+        self.cache_size: int = cache_size
+
+    @staticmethod
+    def read_list_file(list_file: Path) -> list[tuple[str, Optional[str]]]:
+        """
+        Read the files to compile from a list file. Each line contains an input file optionally followed by " ==> " and
+        the output file. Empty lines and lines starting with "#" are ignored. Relative paths are relative to the
+        directory of the list file.
+
+        Example::
+
+            instruments/piano.ksp ==> out/piano.txt
+            instruments/strings.ksp
+
+        :param list_file: File containing the files to compile
+        :return: List of tuples with the input file and the output file (or None)
+        """
+        file_pairs = []
+        base_dir = list_file.parent
+        for line in list_file.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            input_file, _, output_file = line.partition(BatchCompiler.SEPARATOR)
+            output = (base_dir / output_file.strip()).as_posix() if output_file.strip() else None
+            file_pairs.append(((base_dir / input_file.strip()).as_posix(), output))
+        return file_pairs
+
+    @staticmethod
+    def glob_files(pattern: str, output_dir: Optional[Path]) -> list[tuple[str, Optional[str]]]:
+        """
+        Get the files to compile with a glob pattern.
+
+        :param pattern: Glob pattern for the input files, "**" matches any subdirectory
+        :param output_dir: Directory for the compiled files or None to compile without output. The output file name is
+            the input file name up to the first "." with the extension ".txt", e.g. "piano.ksp" => "piano.txt". The
+            directory of the input file relative to the part of the pattern without wildcards is kept, e.g. for
+            "src/**/*.ksp" the file "src/keys/piano.ksp" is compiled to "<output_dir>/keys/piano.txt".
+        :return: List of tuples with the input file and the output file (or None)
+        """
+        file_pairs = []
+        base_dir = BatchCompiler.glob_base_dir(pattern)
+        for input_file in sorted(glob.glob(pattern, recursive=True)):
+            output = None
+            if output_dir:
+                relative_dir = Path(input_file).parent.relative_to(base_dir)
+                output = (output_dir / relative_dir / f"{Path(input_file).name.split('.')[0]}.txt").as_posix()
+            file_pairs.append((input_file, output))
+        return file_pairs
+
+    @staticmethod
+    def glob_base_dir(pattern: str) -> Path:
+        """
+        :param pattern: Glob pattern
+        :return: Leading directories of the pattern up to the first part with a wildcard
+        """
+        parts = Path(pattern).parts
+        base_parts = []
+        for part in parts[:-1]:
+            if any(wildcard in part for wildcard in "*?["):
+                break
+            base_parts.append(part)
+        return Path(*base_parts)
+
+    def duplicate_output_files(self) -> dict[str, list[str]]:
+        """
+        :return: Dictionary where the key is an output file which is written for several input files and the value
+            the list of these input files
+        """
+        input_files: dict[str, list[str]] = {}
+        for input_file, output_file in self.file_pairs:
+            if output_file:
+                input_files.setdefault(Path(output_file).resolve().as_posix(), []).append(input_file)
+        return {output_file: files for output_file, files in input_files.items() if len(files) > 1}
+
+    def run(self, json_diagnostics: bool = False) -> int:
+        """
+        Compile all files. The diagnostics of each file are written to stderr as soon as the file has been compiled.
+        Finally, a summary with the compile time of each file is written to stdout.
+
+        :param json_diagnostics: If True then the diagnostics are written as JSON records instead of the error framing
+        :return: 0 if all files have been compiled, 1 if there was a ParseException and -1 for any other exception
+        """
+        # Parallel workers would overwrite each other's output
+        if duplicates := self.duplicate_output_files():
+            for output_file, input_files in duplicates.items():
+                print(f"*** Error: {output_file} would be written for {', '.join(input_files)}", file=sys.stderr)
+            return -1
+        for _, output_file in self.file_pairs:
+            if output_file:
+                Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        timings: dict[int, tuple[int, float]] = {}
+        with ProcessPoolExecutor(self.jobs, initializer=_init_worker,
+                                 initargs=(self.cache_dir, self.cache_size)) as executor:
+            futures = {}
+            for index, (input_file, output_file) in enumerate(self.file_pairs):
+                args = self.compiler_args + [input_file] + ([output_file] if output_file else [])
+                futures[executor.submit(_compile, args)] = index
+            for future in as_completed(futures):
+                try:
+                    record, duration = future.result()
+                    result = CompileResult.from_dict(record)
+                except Exception as ex:
+                    # E.g. a crashed worker process, which shall not abort the other compilations
+                    result = CompileResult()
+                    result.add_exception(ex)
+                    duration = 0.0
+                sys.stdout.write(result.stdout)
+                sys.stderr.write(result.diagnostics_json() if json_diagnostics else result.error_text())
+                sys.stderr.flush()
+                timings[futures[future]] = (result.exit_code, duration)
+        total = time.perf_counter() - start
+        return self.print_summary(timings, total)
+
+    def print_summary(self, timings: dict[int, tuple[int, float]], total: float) -> int:
+        """
+        Print the summary of the compiled files.
+
+        :param timings: Dictionary where the key is the index of the file pair and the value a tuple of exit code
+            and compile time in seconds
+        :param total: Total time in seconds for compiling all files
+        :return: 0 if all files have been compiled, 1 if there was a ParseException and -1 for any other exception
+        """
+        exit_code = 0
+        failed = 0
+        print(">>> BEGIN Summary")
+        for index, (input_file, _) in enumerate(self.file_pairs):
+            file_exit_code, duration = timings[index]
+            match file_exit_code:
+                case 0:
+                    status = "OK"
+                case 1:
+                    status = "ERROR"
+                case _:
+                    status = "EXCEPTION"
+            if file_exit_code:
+                failed += 1
+                exit_code = -1 if file_exit_code == -1 or exit_code == -1 else 1
+            print(f"{status:<9} {duration:8.3f}s  {input_file}")
+        print(f"{len(self.file_pairs)} files in {total:.3f}s with {self.jobs} workers: "
+              f"{len(self.file_pairs) - failed} compiled, {failed} failed")
+        print(">>> END Summary")
+        return exit_code
@@ -0,0 +1,197 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+"""Cache for compile results keyed by the content of the compiled files and the compiler options"""
+import hashlib
+import importlib.util
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from _compile_job import MISSING_FILE_HASH, CompileResult
+from _import_graph import ImportGraph
+
+
+class CompileCache:
+    FILE_SUFFIX = ".json"
+    """Suffix of the cache files in the cache directory"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_size: int = 64 * 1024 * 1024):
+        """
+        In-memory LRU cache for compile results which is backed by a cache directory (if specified).
+        Each entry contains the diagnostics and the compiled code. An entry is only used if all files read by the
+        compiler (e.g. imports) still have the same content, which is checked with the import graph.
+
+        :param cache_dir: Directory to store the cache files or None for an in-memory cache only
+        :param max_size: Maximum size in bytes for the in-memory cache and for the cache directory
+        """
+        self.cache_dir: Optional[Path] = cache_dir
+        """Directory to store the cache files"""
+        self.max_size: int = max_size
+        """Maximum size in bytes for the in-memory cache and for the cache directory"""
+        self.entries: OrderedDict[str, str] = OrderedDict()
+        """In-memory entries where the key is the cache key and the value is the JSON encoded compile result"""
+        self.size: int = 0
+        """Current size in bytes of the in-memory entries"""
+        self.compiler_version: str = self.get_compiler_version()
+        """Modification time of the compiler to invalidate the entries when the compiler is updated"""
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.import_graph: ImportGraph = ImportGraph(self.cache_dir)
+        """Files read while compiling the scripts with their modification time, size and content hash"""
+
+    @staticmethod
+    def get_compiler_version() -> str:
+        """
+        :return: Identification of the installed compiler
+        """
+        # The compiler module is only located, so a cache hit doesn't need to import it
+        compiler_file = Path(importlib.util.find_spec("ksp_compiler").origin)
+        return f"{compiler_file.as_posix()}:{compiler_file.stat().st_mtime_ns}"
+
+    def get_key(self, source: str, source_file: str, options: dict[str, Any]) -> str:
+        """
+        Get the cache key for a compilation.
+
+        :param source: Source code to compile
+        :param source_file: Path of the compiled script, which is used for error locations and to resolve imports
+        :param options: Options which influence the compiled code
+        :return: Cache key
+        """
+        header = json.dumps([self.compiler_version, source_file, options], sort_keys=True)
+        return hashlib.sha256(f"{header}\n{source}".encode("utf-8", errors="replace")).hexdigest()
+
+    def get(self, key: str) -> Optional[CompileResult]:
+        """
+        Get the compile result from the cache.
+
+        :param key: Cache key as returned by ``get_key()``
+        :return: Cached compile result or None if there is no valid entry
+        """
+        data = self.entries.get(key)
+        if data is not None:
+            self.entries.move_to_end(key)
+        elif self.cache_dir:
+            cache_file = self.cache_dir / f"{key}{self.FILE_SUFFIX}"
+            try:
+                data = cache_file.read_text(encoding="utf-8")
+                # Mark the file as recently used
+                os.utime(cache_file)
+            except OSError:
+                return None
+            self.add_entry(key, data)
+        else:
+            return None
+        result = CompileResult.from_dict(json.loads(data))
+        if not self.is_valid(result):
+            self.remove(key)
+            return None
+        return result
+
+    def put(self, key: str, result: CompileResult):
+        """
+        Store the compile result in the cache.
+        Results of failed compilations due to an exception (other than a ParseException) are not stored, because they
+        might be caused by temporary problems. Results without information about the imported files are also not
+        stored.
+
+        :param key: Cache key as returned by ``get_key()``
+        :param result: Compile result to store
+        """
+        if result.exit_code not in (0, 1) or result.files is None:
+            return
+        data = json.dumps(result.as_dict(), separators=(",", ":"))
+        self.add_entry(key, data)
+        if self.cache_dir:
+            cache_file = self.cache_dir / f"{key}{self.FILE_SUFFIX}"
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                tmp_file.write_text(data, encoding="utf-8")
+                # Replace atomically, because other wrapper processes might use the same cache directory
+                os.replace(tmp_file, cache_file)
+            except OSError:
+                tmp_file.unlink(missing_ok=True)
+            self.evict_files()
+            self.import_graph.save()
+
+    def remove(self, key: str):
+        """
+        Remove an entry from the cache.
+
+        :param key: Cache key of the entry
+        """
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        if self.cache_dir:
+            (self.cache_dir / f"{key}{self.FILE_SUFFIX}").unlink(missing_ok=True)
+
+    def add_entry(self, key: str, data: str):
+        """
+        Add an entry to the in-memory cache and evict the least recently used entries if the cache is too large.
+
+        :param key: Cache key of the entry
+        :param data: JSON encoded compile result
+        """
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_size and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def evict_files(self):
+        """
+        Delete the least recently used cache files if the cache directory is too large.
+        """
+        cache_files = []
+        total_size = 0
+        for cache_file in self.cache_dir.glob(f"*{self.FILE_SUFFIX}"):
+            if cache_file.name == ImportGraph.FILE_NAME:
+                continue
+            try:
+                stat = cache_file.stat()
+            except OSError:
+                continue
+            cache_files.append((stat.st_mtime_ns, stat.st_size, cache_file))
+            total_size += stat.st_size
+        cache_files.sort()
+        for _, size, cache_file in cache_files[:-1]:
+            if total_size <= self.max_size:
+                break
+            cache_file.unlink(missing_ok=True)
+            total_size -= size
+
+    def is_valid(self, result: CompileResult) -> bool:
+        """
+        Check if all files read by the compiler still have the same content and the files which couldn't be read are
+        still missing.
+
+        :param result: Compile result to check
+        :return: True if the result is still valid, False otherwise
+        """
+        for file, file_hash in result.files.items():
+            try:
+                current_hash = self.import_graph.file_hash(file)
+            except (OSError, ValueError):
+                current_hash = MISSING_FILE_HASH
+            if current_hash != file_hash:
+                return False
+        return True
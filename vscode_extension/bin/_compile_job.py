@@ -0,0 +1,559 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+"""Compile a KSP script inside the running Python process"""
+import argparse
+import hashlib
+import io
+import json
+import re
+import sys
+import threading
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Optional, TYPE_CHECKING
+
+import _find_ksp_compiler  # noqa
+from _compile_timings import CompileTimings
+
+# The compiler is imported on first use, so e.g. a cache hit doesn't pay for importing it
+if TYPE_CHECKING:
+    from _compile_cache import CompileCache
+    from ksp_compiler import KSPCompiler
+
+ENCODING = "latin-1"
+"""Encoding used by the SublimeKSP compiler for reading and writing scripts"""
+EXIT_CANCELLED = 3
+"""Exit code of a compilation which has been cancelled"""
+MISSING_FILE_HASH = "missing"
+"""Content hash of a file which couldn't be read, e.g. an import which doesn't exist"""
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser for the compiler options as built by ``CompileBuilder.build()`` of the VS Code extension.
+    The short options are the same as of the SublimeKSP command line compiler, so existing calls keep working.
+
+    :return: Argument parser for the compiler options
+    """
+    parser = argparse.ArgumentParser(description="Compile a KSP script with the SublimeKSP compiler")
+    parser.add_argument('-f', '--force', action='store_true',
+                        help="Force all specified compiler options, overriding any compile_with pragma directives")
+    parser.add_argument('-c', '--compact', action='store_true', help="Remove indentation and empty lines")
+    parser.add_argument('-v', '--compact_variables', action='store_true', help="Shorten and obfuscate variable names")
+    parser.add_argument('-d', '--combine_callbacks', action='store_true', help="Combine duplicate callbacks")
+    parser.add_argument('-e', '--extra_syntax_check', '--extra_syntax_checks', dest='extra_syntax_check',
+                        action='store_true', help="Additional syntax checks during compilation")
+    parser.add_argument('-o', '--optimize', action='store_true', help="Optimize the compiled code")
+    parser.add_argument('-b', '--extra_branch_optimization', action='store_true',
+                        help="Additional branch optimization of the compiled code")
+    parser.add_argument('-i', '--indent-size', dest='indent_size', type=int, default=4, help="Indent size in spaces")
+    parser.add_argument('-t', '--add_compile_date', action='store_true',
+                        help="Add the compile date to the compiled code")
+    parser.add_argument('-x', '--sanitize_exit_command', action='store_true', help="Sanitize the exit command")
+    parser.add_argument('--check-only', dest='check_only', action='store_true',
+                        help="Only check syntax and semantics, skip optimization, compaction and code generation")
+    parser.add_argument('--timings', action='store_true',
+                        help="Report wall time, CPU time and peak memory of each compile phase")
+    parser.add_argument('--profile', type=Path, help="Write the cProfile statistics of the compilation to this file")
+    parser.add_argument('--source-name', dest='source_name',
+                        help="Logical file name used for error locations and imports if the script is read from stdin")
+    parser.add_argument('source_file', help="KSP script to compile or \"-\" to read the script from stdin")
+    parser.add_argument('output_file', nargs='?', help="File to write the compiled code to")
+    return parser
+
+
+def read_file(file: str) -> str:
+    """
+    Read a KSP script file, e.g. for resolving imports.
+
+    :param file: Path of the file to read
+    :return: Content of the file
+    """
+    return Path(file).read_bytes().decode(ENCODING)
+
+
+def content_hash(content: str) -> str:
+    """
+    :param content: Content to get the hash for
+    :return: SHA-256 hex digest of the content
+    """
+    return hashlib.sha256(content.encode(ENCODING, errors="replace")).hexdigest()
+
+
+class CompileCancelled(Exception):
+    """Raised at a phase boundary of the compiler if the compilation has been cancelled"""
+
+
+class CheckFinished(Exception):
+    """Raised at the start of the code generation if only the syntax and semantics are checked"""
+
+
+class Diagnostic:
+    ERROR = "error"
+    """Severity of errors"""
+    WARNING = "warning"
+    """Severity of warnings"""
+
+    def __init__(self, severity: str, message: str, file: str = "", line_no: int = 0, command: str = "",
+                 exception_type: str = ""):
+        """
+        Container for a single error or warning reported by the compiler.
+
+        :param severity: Either Diagnostic.ERROR or Diagnostic.WARNING
+        :param message: Error message, warning or traceback
+        :param file: File where the problem has been found (if any)
+        :param line_no: Line number where the problem has been found (if any)
+        :param command: Command text of the line where the problem has been found (if any)
+        :param exception_type: Name of the exception class, e.g. "ParseException" or empty for printed messages
+        """
+        self.severity: str = severity
+        self.message: str = message
+        self.file: str = file
+        self.line_no: int = line_no
+        self.command: str = command
+        self.exception_type: str = exception_type
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        :return: Dictionary used for the JSON diagnostics output
+        """
+        return {
+            "severity": self.severity,
+            "file": self.file,
+            "line": self.line_no,
+            "command": self.command,
+            "type": self.exception_type,
+            "message": self.message
+        }
+
+    @staticmethod
+    def from_dict(record: dict[str, Any]) -> 'Diagnostic':
+        """
+        :param record: Dictionary as returned by ``as_dict()``
+        :return: Diagnostic created from the dictionary
+        """
+        return Diagnostic(record["severity"], record["message"], record["file"], record["line"], record["command"],
+                          record["type"])
+
+    def error_text(self) -> str:
+        """
+        Format the diagnostic in the framing which is parsed by the VS Code extension, e.g.::
+
+            >>> BEGIN Error
+            <message>
+            >>> Command: <command>
+            >>> Location: <file>: <line number>
+            >>> END Error
+
+        A ``ParseException`` is reported as "Error" and any other exception as "Exception".
+
+        :return: Error block
+        """
+        error_type = "Error" if self.exception_type == "ParseException" else "Exception"
+        lines = [f">>> BEGIN {error_type}", self.message]
+        if self.line_no:
+            lines.append(f">>> Command: {self.command}")
+            lines.append(f">>> Location: {self.file}: {self.line_no}")
+        lines.append(f">>> END {error_type}")
+        return "\n".join(lines) + "\n"
+
+
+class CompileResult:
+    MESSAGE_PATTERN = re.compile(r"^(ERROR|WARNING)\s+(.+):(\d+):\s+(.*)$")
+    """Pattern for errors and warnings printed by the compiler, e.g. WARNING file.ksp:12: message"""
+
+    def __init__(self):
+        """
+        Container for the result of a single compilation.
+        """
+        self.exit_code: int = 0
+        """0 on success, 1 for a ParseException, -1 for any other exception and EXIT_CANCELLED if cancelled"""
+        self.diagnostics: list[Diagnostic] = []
+        """Errors and warnings reported by the compiler"""
+        self.compiled_code: Optional[str] = None
+        """Compiled code or None if the compilation failed"""
+        self.stdout: str = ""
+        """Everything the compiler printed to stdout while compiling"""
+        self.files: Optional[dict[str, str]] = {}
+        """Content hash of each file read by the compiler (e.g. imports) or None if the files are unknown"""
+        self.timings: Optional[dict[str, Any]] = None
+        """Timings of the compile phases if requested with --timings (not stored in the cache)"""
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        :return: Dictionary e.g. to be stored in the compile cache
+        """
+        return {
+            "exit_code": self.exit_code,
+            "diagnostics": [diagnostic.as_dict() for diagnostic in self.diagnostics],
+            "compiled_code": self.compiled_code,
+            "stdout": self.stdout,
+            "files": self.files
+        }
+
+    @staticmethod
+    def from_dict(record: dict[str, Any]) -> 'CompileResult':
+        """
+        :param record: Dictionary as returned by ``as_dict()``
+        :return: CompileResult created from the dictionary
+        """
+        result = CompileResult()
+        result.exit_code = record["exit_code"]
+        result.diagnostics = [Diagnostic.from_dict(diagnostic) for diagnostic in record["diagnostics"]]
+        result.compiled_code = record["compiled_code"]
+        result.stdout = record["stdout"]
+        result.files = record["files"]
+        return result
+
+    def add_exception(self, ex: Exception):
+        """
+        Add the exception which stopped the compilation to the diagnostics.
+
+        :param ex: Exception to add
+        """
+        # The compiler is already imported if it raised the exception
+        ksp_compiler = sys.modules.get("ksp_compiler")
+        if ksp_compiler and isinstance(ex, ksp_compiler.ParseException):
+            self.exit_code = 1
+            error = Diagnostic(Diagnostic.ERROR, ex.error_message, exception_type=type(ex).__name__)
+            if ex.line:
+                error.command = ex.line.command
+                error.file = ex.line.filename
+                error.line_no = ex.line.lineno
+        else:
+            import traceback
+            self.exit_code = -1
+            message = "".join(traceback.format_exception(ex))
+            error = Diagnostic(Diagnostic.ERROR, message, exception_type=type(ex).__name__)
+        self.diagnostics.append(error)
+
+    def set_cancelled(self, phase: str):
+        """
+        Mark the compilation as cancelled. The diagnostics of a cancelled compilation are incomplete, so they are
+        dropped.
+
+        :param phase: Last phase reported by the compiler before the cancellation
+        """
+        self.exit_code = EXIT_CANCELLED
+        self.diagnostics = []
+        self.compiled_code = None
+        self.files = None
+        self.stdout = f"Compilation cancelled at {phase}\n" if phase else "Compilation cancelled\n"
+
+    def add_printed_messages(self, stdout: str):
+        """
+        Add the errors and warnings printed by the compiler to the diagnostics.
+
+        :param stdout: Everything the compiler printed to stdout
+        """
+        self.stdout = stdout
+        for line in stdout.splitlines():
+            if m := CompileResult.MESSAGE_PATTERN.match(line):
+                self.diagnostics.append(Diagnostic(m.group(1).lower(), m.group(4), m.group(2), int(m.group(3))))
+
+    def error_text(self) -> str:
+        """
+        :return: Error blocks of all exceptions in the framing parsed by the VS Code extension or an empty string
+        """
+        return "".join(diagnostic.error_text() for diagnostic in self.diagnostics if diagnostic.exception_type)
+
+    def diagnostics_json(self) -> str:
+        """
+        :return: One compact JSON record per line for each diagnostic
+        """
+        return "".join(json.dumps(diagnostic.as_dict(), separators=(",", ":")) + "\n"
+                       for diagnostic in self.diagnostics)
+
+
+class CompileJob:
+    CODE_GENERATION_PHASE = re.compile(r"^\W*(optimi[sz]|compact|generat)", re.IGNORECASE)
+    """Pattern for the description of the compiler phases which are skipped with --check-only.
+    The compiler reports its phases only as free text to the progress callback, e.g. "Optimizing code..." or
+    "Generating compiled code...", so this assumes that the description of these phases starts with one of these words
+    and that they are the last phases after all checks. If the descriptions change, then no phase matches and the
+    script is compiled completely, so the result is still correct but not faster."""
+
+    def __init__(self, args: list[str], cache: Optional['CompileCache'] = None, source: Optional[str] = None,
+                 cancel_event: Optional[threading.Event] = None):
+        """
+        Compile a single KSP script with the given command line options.
+
+        :param args: Command line options as built by ``CompileBuilder.build()`` without the script name
+        :param cache: Cache for the compile results or None to always compile
+        :param source: Source code used instead of stdin if the source file is "-"
+        :param cancel_event: Event to cancel the compilation at the next phase boundary or None if not cancellable
+        """
+        self.options: argparse.Namespace = create_argument_parser().parse_args(args)
+        """Parsed compiler options"""
+        # Optimization requires the extra syntax checks, see also the SublimeKSP command line compiler
+        if self.options.optimize:
+            self.options.extra_syntax_check = True
+        # Only the checks are done, so the options for the compiled code are ignored. Combining the callbacks is kept,
+        # because it influences the reported semantic errors.
+        if self.options.check_only:
+            self.options.optimize = False
+            self.options.extra_branch_optimization = False
+            self.options.compact = False
+            self.options.compact_variables = False
+            self.options.add_compile_date = False
+            self.options.output_file = None
+        self.cache: Optional[CompileCache] = cache
+        """Cache for the compile results"""
+        self.files: dict[str, str] = {}
+        """Content hash of each file read by the compiler"""
+        self.source: Optional[str] = source
+        """Source code used instead of reading stdin"""
+        self.cancel_event: threading.Event = cancel_event or threading.Event()
+        """Event to cancel the compilation at the next phase boundary"""
+        self.phase: str = ""
+        """Last phase reported by the compiler"""
+        self.check_finished: bool = False
+        """True once all checks have been done with --check-only"""
+        self.timings: Optional[CompileTimings] = CompileTimings() if self.options.timings else None
+        """Timings of the compile phases if requested with --timings"""
+
+    def compiler_options(self) -> dict[str, Any]:
+        """
+        :return: Options which influence the compiled code
+        """
+        options = vars(self.options).copy()
+        del options["source_file"]
+        del options["source_name"]
+        del options["output_file"]
+        del options["timings"]
+        del options["profile"]
+        return options
+
+    def read_file(self, file: str) -> str:
+        """
+        Read a file for the compiler and remember its content hash.
+        If the file can't be read then it's remembered as missing, so a cached result with the error becomes invalid
+        once the file can be read.
+
+        :param file: Path of the file to read
+        :return: Content of the file
+        """
+        path = Path(file).resolve().as_posix()
+        try:
+            if self.cache:
+                content = self.cache.import_graph.read_file(file)
+            else:
+                content = read_file(file)
+        except (OSError, ValueError):
+            self.files[path] = MISSING_FILE_HASH
+            raise
+        self.files[path] = content_hash(content)
+        return content
+
+    @staticmethod
+    def compiler_class() -> type['KSPCompiler']:
+        """
+        :return: Compiler class, which is imported on first use
+        """
+        from ksp_compiler import KSPCompiler
+        return KSPCompiler
+
+    @staticmethod
+    def accepts(function: Callable, name: str) -> bool:
+        """
+        :param function: Function of the compiler
+        :param name: Name of the parameter
+        :return: True if the function has a parameter with the given name, False otherwise
+        """
+        # Only needed when compiling, so it's imported on first use
+        import inspect
+        return name in inspect.signature(function).parameters
+
+    def create_compiler(self, source: str, base_dir: str) -> 'KSPCompiler':
+        """
+        Create the SublimeKSP compiler for the given source.
+        The keyword arguments of the compiler changed between the SublimeKSP releases, so only the arguments known by
+        the installed compiler are passed.
+
+        :param source: Source code to compile
+        :param base_dir: Directory used to resolve imports
+        :return: Compiler instance
+        """
+        options = self.options
+        all_kwargs = {
+            "compact": options.compact,
+            "compactVars": options.compact_variables,
+            "compact_variables": options.compact_variables,
+            "comments_on_expansion": False,
+            "read_file_func": self.read_file,
+            "extra_syntax_checks": options.extra_syntax_check,
+            "optimize": options.optimize,
+            "extra_branch_optimization": options.extra_branch_optimization,
+            "combine_callbacks": options.combine_callbacks,
+            "check_empty_compound_statements": False,
+            "add_compiled_date_comment": options.add_compile_date,
+            "add_compile_date": options.add_compile_date,
+            "sanitize_exit_command": options.sanitize_exit_command,
+            "force_compiler_arguments": options.force,
+            "indent_size": options.indent_size,
+        }
+        compiler_class = self.compiler_class()
+        kwargs = {name: value for name, value in all_kwargs.items() if self.accepts(compiler_class.__init__, name)}
+        return compiler_class(source, base_dir, **kwargs)
+
+    def run(self) -> CompileResult:
+        """
+        Compile the script (or get the result from the cache) and write the output file (if specified).
+        With --profile the statistics of the whole run are written to the profile file.
+
+        :return: Result of the compilation
+        """
+        if not self.options.profile:
+            return self.run_compile()
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return self.run_compile()
+        finally:
+            profiler.disable()
+            profiler.dump_stats(self.options.profile)
+
+    def run_compile(self) -> CompileResult:
+        """
+        Compile the script (or get the result from the cache) and write the output file (if specified).
+
+        :return: Result of the compilation
+        """
+        self.lap("read source")
+        try:
+            if self.options.source_file == "-":
+                # The logical file name is used to resolve the imports relative to the real document directory
+                source_file = Path(self.options.source_name or "stdin").resolve()
+                if self.source is None:
+                    self.source = sys.stdin.buffer.read().decode("utf-8")
+                source = self.source
+            else:
+                source_file = Path(self.options.source_file).resolve()
+                source = self.read_file(source_file.as_posix())
+        except Exception as ex:
+            result = CompileResult()
+            result.add_exception(ex)
+            return result
+        key: Optional[str] = None
+        result: Optional[CompileResult] = None
+        # A compile date in the output would be outdated when taken from the cache
+        if self.cache and not self.options.add_compile_date:
+            self.lap("cache lookup")
+            key = self.cache.get_key(source, source_file.as_posix(), self.compiler_options())
+            result = self.cache.get(key)
+        if not result:
+            result = self.compile(source, source_file.parent.as_posix())
+            if result.exit_code == EXIT_CANCELLED:
+                return result
+            # Errors in the compiled script itself might have no file name
+            for diagnostic in result.diagnostics:
+                if diagnostic.line_no and not diagnostic.file:
+                    diagnostic.file = source_file.as_posix()
+            if self.cache and result.files is not None:
+                self.cache.import_graph.set_imports(source_file.as_posix(), list(result.files))
+            if key:
+                self.lap("cache store")
+                self.cache.put(key, result)
+        if self.options.output_file and result.compiled_code is not None:
+            self.lap("write output")
+            try:
+                Path(self.options.output_file).write_text(result.compiled_code, encoding=ENCODING)
+            except Exception as ex:
+                result.add_exception(ex)
+        if self.timings:
+            self.lap("")
+            result.timings = self.timings.as_dict()
+        return result
+
+    def compile(self, source: str, base_dir: str) -> CompileResult:
+        """
+        Compile the source code.
+        Everything printed by the compiler to stdout is captured in the result.
+
+        :param source: Source code to compile
+        :param base_dir: Directory used to resolve imports
+        :return: Result of the compilation
+        """
+        result = CompileResult()
+        error: Optional[Exception] = None
+        stdout = io.StringIO()
+        self.files = {}
+        self.phase = ""
+        self.check_finished = False
+        try:
+            with redirect_stdout(stdout):
+                self.check_cancelled()
+                self.lap("compiler setup")
+                compiler = self.create_compiler(source, base_dir)
+                # Older compilers don't report their progress, so they can only be cancelled before they start
+                if self.accepts(compiler.compile, "callback"):
+                    compiler.compile(callback=self.on_progress)
+                else:
+                    compiler.compile()
+                if not self.options.check_only:
+                    self.lap("collect output")
+                    result.compiled_code = compiler.compiled_code.replace("\r", "")
+        except Exception as ex:
+            # The compiler might wrap the exception raised in the callback, so the flag is checked
+            error = None if self.check_finished else ex
+        # The event is checked as well for the same reason
+        if isinstance(error, CompileCancelled) or self.cancel_event.is_set():
+            result.set_cancelled(self.phase)
+            return result
+        # Messages printed while compiling are reported before the error which stopped the compilation
+        result.add_printed_messages(stdout.getvalue())
+        if error:
+            result.add_exception(error)
+        # Without the file hook of the compiler the imported files are unknown
+        if self.accepts(self.compiler_class().__init__, "read_file_func"):
+            result.files = self.files
+        else:
+            result.files = None
+        return result
+
+    def on_progress(self, phase: str, percent: float):
+        """
+        Called by the compiler at each phase boundary, e.g. parsing, macro expansion, optimization and code generation.
+
+        :param phase: Description of the phase
+        :param percent: Progress of the compilation in percent
+        """
+        self.phase = phase
+        self.lap(phase)
+        self.check_cancelled()
+        if self.options.check_only and self.CODE_GENERATION_PHASE.search(phase):
+            self.check_finished = True
+            raise CheckFinished(phase)
+
+    def check_cancelled(self):
+        """
+        Abort the compilation if it has been cancelled.
+        """
+        if self.cancel_event.is_set():
+            raise CompileCancelled(self.phase)
+
+    def lap(self, next_phase: str):
+        """
+        Finish the current phase and start the next one (if timings are requested).
+
+        :param next_phase: Name of the next phase
+        """
+        if self.timings:
+            self.timings.lap(next_phase)
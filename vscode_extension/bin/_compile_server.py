@@ -0,0 +1,336 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+"""Long-lived compile server which keeps the SublimeKSP compiler modules imported"""
+import argparse
+import hmac
+import io
+import ipaddress
+import json
+import queue
+import secrets
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from contextlib import redirect_stderr
+from pathlib import Path
+from typing import Any, Optional, TextIO
+
+from _compile_cache import CompileCache
+from _compile_job import EXIT_CANCELLED, CompileJob
+
+
+class CompileServer:
+    def __init__(self, cache: Optional[CompileCache] = None):
+        """
+        Compile server handling one JSON request per line and answering with one JSON response per line.
+
+        Request::
+
+            {"id": 1, "args": ["--compact", "--indent-size", "4", "input.ksp", "output.txt"]}
+
+        The ``args`` are the same as built by ``CompileBuilder.build()`` without the script name.
+        If the source file in ``args`` is "-" then the script is taken from the optional ``source`` field.
+
+        Response::
+
+            {"id": 1, "exit_code": 1, "stdout": "", "stderr": ">>> BEGIN Error\\n...\\n>>> END Error\\n",
+             "diagnostics": [{"severity": "error", "file": "input.ksp", "line": 3, ...}]}
+
+        The ``stderr`` contains the same ``>>> BEGIN Error``/``>>> END Error`` framing as printed by a single compile.
+        The ``diagnostics`` contain the same records as printed with ``--json-diagnostics``.
+        The request ``{"command": "dependents", "file": "import.ksp"}`` returns the ``scripts`` which imported the
+        file when they have been compiled the last time, e.g. to validate them again after the file has been changed.
+        The request ``{"command": "shutdown"}`` stops the server.
+
+        The request ``{"command": "cancel", "target": 1}`` cancels the compile request with the id 1, either at the next
+        phase boundary of the compiler if it is already running or before it is started. Without ``target`` the running
+        and all queued compile requests are cancelled. Requests are read while compiling, so the cancel request is
+        handled immediately. A cancelled compile request is answered with the exit code ``EXIT_CANCELLED``.
+        SIGINT cancels the running compile request as well, but stops the server if it's idle.
+
+        Requests from a socket must contain the ``token`` printed when the server is started, e.g.
+        ``{"id": 1, "token": "...", "args": [...]}``, and may only write files (the output file and the ``--profile``)
+        into the directory of the source file or below.
+
+        :param cache: Cache for the compile results shared by all requests or None to always compile
+        """
+        self.running: bool = True
+        """False once a shutdown request has been received"""
+        self.cache: Optional[CompileCache] = cache
+        """Cache for the compile results shared by all requests"""
+        # Reentrant, because the signal handler might interrupt the serving thread while it holds the lock
+        self.lock: threading.RLock = threading.RLock()
+        """Lock for the cancel state and for writing the responses"""
+        self.current_id: Any = None
+        """Id of the running compile request"""
+        self.cancel_event: Optional[threading.Event] = None
+        """Event to cancel the running compile request or None if no request is running"""
+        self.cancelled_ids: set[Any] = set()
+        """Ids of the queued compile requests which have been cancelled before they have been started"""
+        self.pending_ids: set[Any] = set()
+        """Ids of the queued compile requests"""
+        self.token: Optional[str] = None
+        """Token which must be sent with each request or None if the requests are trusted (stdin)"""
+        self.restrict_paths: bool = False
+        """If True then files may only be written into the directory of the source file or below"""
+
+    def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Handle a single request.
+
+        :param request: Decoded JSON request
+        :return: Response to be encoded as JSON
+        """
+        response: dict[str, Any] = {"id": request.get("id")}
+        command = request.get("command", "compile")
+        match command:
+            case "compile":
+                with self.lock:
+                    self.pending_ids.discard(response["id"])
+                    cancelled = response["id"] in self.cancelled_ids
+                    self.cancelled_ids.discard(response["id"])
+                    self.current_id = response["id"]
+                    self.cancel_event = threading.Event()
+                    cancel_event = self.cancel_event
+                try:
+                    if cancelled:
+                        response.update({"exit_code": EXIT_CANCELLED, "stdout": "Compilation cancelled\n",
+                                         "stderr": "", "diagnostics": []})
+                    else:
+                        response.update(self.compile(request.get("args", []), request.get("source", ""),
+                                                     cancel_event))
+                finally:
+                    with self.lock:
+                        self.current_id = None
+                        self.cancel_event = None
+            case "dependents":
+                scripts = self.cache.import_graph.dependents(request["file"]) if self.cache else set()
+                response["exit_code"] = 0
+                response["scripts"] = sorted(scripts)
+            case "ping":
+                response["exit_code"] = 0
+            case "shutdown":
+                self.running = False
+                response["exit_code"] = 0
+            case _:
+                response["exit_code"] = -1
+                response["stderr"] = f"Unknown command {command}\n"
+        return response
+
+    def cancel(self, target: Any = None) -> bool:
+        """
+        Cancel a compile request. This is called from the thread reading the requests or from the signal handler.
+
+        :param target: Id of the compile request to cancel or None to cancel the running and all queued requests
+        :return: True if a compile request has been cancelled, False if there is no such request
+        """
+        with self.lock:
+            found = False
+            if self.cancel_event and (target is None or target == self.current_id):
+                self.cancel_event.set()
+                found = True
+            if target is None:
+                self.cancelled_ids.update(self.pending_ids)
+                found = found or bool(self.pending_ids)
+            elif target in self.pending_ids:
+                self.cancelled_ids.add(target)
+                found = True
+            return found
+
+    def compile(self, args: list[str], source: str, cancel_event: Optional[threading.Event] = None) -> dict[str, Any]:
+        """
+        Compile a script.
+
+        :param args: Command line options as built by ``CompileBuilder.build()`` without the script name
+        :param source: Script to compile if the source file is "-"
+        :param cancel_event: Event to cancel the compilation or None if it can't be cancelled
+        :return: Response fields with exit code, stdout and stderr of the compilation
+        """
+        stderr = io.StringIO()
+        try:
+            # Invalid options are reported by argparse on stderr followed by a SystemExit
+            with redirect_stderr(stderr):
+                job = CompileJob(args, self.cache, source, cancel_event)
+        except SystemExit as ex:
+            return {"exit_code": ex.code, "stdout": "", "stderr": stderr.getvalue(), "diagnostics": []}
+        if self.restrict_paths and (error := CompileServer.check_paths(job.options)):
+            return {"exit_code": -1, "stdout": "", "stderr": error, "diagnostics": []}
+        result = job.run()
+        response = {
+            "exit_code": result.exit_code,
+            "stdout": result.stdout,
+            "stderr": result.error_text(),
+            "diagnostics": [diagnostic.as_dict() for diagnostic in result.diagnostics]
+        }
+        if result.timings:
+            response["timings"] = result.timings
+        return response
+
+    @staticmethod
+    def check_paths(options: argparse.Namespace) -> str:
+        """
+        Check that the files written by a compile request are in the directory of the source file or below.
+        A script sent with the request has no directory, so it can't write any file.
+
+        :param options: Parsed compiler options of the request
+        :return: Error message or an empty string if the files may be written
+        """
+        for name, path in (("output file", options.output_file), ("profile file", options.profile)):
+            if not path:
+                continue
+            if options.source_file == "-":
+                return f"The {name} {path} can't be written for a script sent with the request\n"
+            source_dir = Path(options.source_file).resolve().parent
+            if not Path(path).resolve().is_relative_to(source_dir):
+                return f"The {name} {path} must be in the directory {source_dir} of the source file\n"
+        return ""
+
+    @staticmethod
+    def is_loopback(host: str) -> bool:
+        """
+        :param host: Host name or address
+        :return: True if all addresses of the host are loopback addresses
+        """
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+        except socket.gaierror:
+            return False
+        return bool(addresses) and all(ipaddress.ip_address(address.split("%")[0]).is_loopback
+                                       for address in addresses)
+
+    def encode_response(self, response: dict[str, Any]) -> str:
+        """
+        :param response: Response to encode
+        :return: JSON encoded response line
+        """
+        return json.dumps(response, separators=(",", ":")) + "\n"
+
+    def read_requests(self, in_stream: TextIO, out_stream: TextIO, requests: queue.Queue):
+        """
+        Read the requests line by line in a separate thread, so cancel requests are handled while compiling.
+        All other requests are queued for the serving thread. None is queued once the input stream is closed.
+
+        :param in_stream: Stream to read the requests from
+        :param out_stream: Stream to write the responses of invalid and cancel requests to
+        :param requests: Queue for the decoded requests
+        """
+        try:
+            for line in in_stream:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as ex:
+                    self.write_response(out_stream, {"id": None, "exit_code": -1, "stderr": f"Invalid request: {ex}\n"})
+                    continue
+                if self.token is not None and not hmac.compare_digest(str(request.get("token", "")), self.token):
+                    # The connection is closed, so the token can't be guessed with many requests
+                    self.write_response(out_stream, {"id": request.get("id"), "exit_code": -1,
+                                                     "stderr": "Invalid token\n"})
+                    break
+                if request.get("command") == "cancel":
+                    found = self.cancel(request.get("target"))
+                    self.write_response(out_stream, {"id": request.get("id"), "exit_code": 0, "cancelled": found})
+                    continue
+                if request.get("command", "compile") == "compile":
+                    with self.lock:
+                        self.pending_ids.add(request.get("id"))
+                requests.put(request)
+                if request.get("command") == "shutdown":
+                    break
+        except (OSError, ValueError):
+            # The stream has been closed while reading
+            pass
+        requests.put(None)
+
+    def write_response(self, out_stream: TextIO, response: dict[str, Any]):
+        """
+        Write a response line. The responses are written from the serving and from the reading thread.
+
+        :param out_stream: Stream to write the response to
+        :param response: Response to write
+        """
+        with self.lock:
+            out_stream.write(self.encode_response(response))
+            out_stream.flush()
+
+    def serve_stream(self, in_stream: TextIO, out_stream: TextIO):
+        """
+        Handle requests read line by line from the input stream until a shutdown request is received or the input
+        stream is closed.
+
+        :param in_stream: Stream to read the requests from
+        :param out_stream: Stream to write the responses to
+        """
+        requests: queue.Queue = queue.Queue()
+        reader = threading.Thread(target=self.read_requests, args=(in_stream, out_stream, requests), daemon=True)
+        reader.start()
+        while self.running:
+            request = requests.get()
+            if request is None:
+                break
+            self.write_response(out_stream, self.handle_request(request))
+
+    def on_signal(self, signum: int, frame: Any):
+        """
+        Cancel the running compile request on SIGINT or stop the server if it's idle.
+
+        :param signum: Number of the received signal
+        :param frame: Current stack frame
+        """
+        if not self.cancel():
+            raise KeyboardInterrupt()
+
+    def serve_stdio(self):
+        """
+        Handle requests from stdin and write the responses to stdout.
+        """
+        signal.signal(signal.SIGINT, self.on_signal)
+        self.serve_stream(sys.stdin, sys.stdout)
+
+    def serve_socket(self, host: str, port: int):
+        """
+        Handle requests from a local socket. Connections are handled one after another, because the compiler uses
+        global state. The listening address and the token to be sent with each request are printed as first line to
+        stdout, so port 0 can be used to get any free port. Only loopback addresses are allowed, because a request can
+        write files.
+
+        :param host: Loopback host address to listen on
+        :param port: Port to listen on or 0 for any free port
+        """
+        if not CompileServer.is_loopback(host):
+            raise ValueError(f"The compile server socket must listen on a loopback address, not on {host}")
+        self.token = secrets.token_hex(16)
+        self.restrict_paths = True
+        server = self
+        signal.signal(signal.SIGINT, self.on_signal)
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                in_stream = io.TextIOWrapper(self.rfile, encoding="utf-8")
+                out_stream = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+                server.serve_stream(in_stream, out_stream)
+
+        with socketserver.TCPServer((host, port), RequestHandler) as tcp_server:
+            address, port = tcp_server.server_address[:2]
+            print(f"Listening on {address}:{port} with token {self.token}", flush=True)
+            while self.running:
+                tcp_server.handle_request()
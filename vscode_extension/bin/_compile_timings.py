@@ -0,0 +1,100 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+"""Wall time, CPU time and peak memory of the compile phases"""
+import time
+from typing import Any, Optional
+
+from _memory_util import peak_rss_kib
+
+
+class PhaseTiming:
+    def __init__(self, phase: str, wall: Optional[float], cpu: float, peak_rss: Optional[int]):
+        """
+        Timing of a single phase.
+
+        :param phase: Name of the phase, e.g. "imports" or the description reported by the compiler
+        :param wall: Wall time in seconds or None if it's unknown
+        :param cpu: CPU time in seconds
+        :param peak_rss: Peak resident set size of the process in KiB at the end of the phase or None if it's unknown
+        """
+        self.phase: str = phase
+        self.wall: Optional[float] = wall
+        self.cpu: float = cpu
+        self.peak_rss: Optional[int] = peak_rss
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        :return: Dictionary to be encoded as JSON
+        """
+        return {
+            "phase": self.phase,
+            "wall": None if self.wall is None else round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+            "peak_rss_kib": self.peak_rss
+        }
+
+
+class CompileTimings:
+    def __init__(self):
+        """
+        Measure the wall time, CPU time and peak memory of consecutive phases. Each call of ``lap()`` finishes the
+        current phase and starts the next one.
+        """
+        self.phases: list[PhaseTiming] = []
+        """Finished phases in the order of their execution"""
+        self.phase: str = "setup"
+        """Name of the current phase"""
+        self.wall: float = time.perf_counter()
+        """Wall clock when the current phase has been started"""
+        self.cpu: float = time.process_time()
+        """CPU clock when the current phase has been started"""
+
+    def add(self, phase: str, wall: Optional[float], cpu: float):
+        """
+        Add a phase measured outside, e.g. the interpreter startup.
+
+        :param phase: Name of the phase
+        :param wall: Wall time in seconds or None if it's unknown
+        :param cpu: CPU time in seconds
+        """
+        self.phases.append(PhaseTiming(phase, wall, cpu, peak_rss_kib()))
+
+    def lap(self, next_phase: str):
+        """
+        Finish the current phase and start the next one.
+
+        :param next_phase: Name of the next phase
+        """
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        self.phases.append(PhaseTiming(self.phase, wall - self.wall, cpu - self.cpu, peak_rss_kib()))
+        self.phase = next_phase
+        self.wall = wall
+        self.cpu = cpu
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        :return: Dictionary with all finished phases and their totals to be encoded as JSON
+        """
+        return {
+            "phases": [phase.as_dict() for phase in self.phases],
+            "wall": round(sum(phase.wall for phase in self.phases if phase.wall is not None), 6),
+            "cpu": round(sum(phase.cpu for phase in self.phases), 6),
+            "peak_rss_kib": peak_rss_kib()
+        }
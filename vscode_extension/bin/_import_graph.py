@@ -0,0 +1,180 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+"""Import dependency graph of the compiled scripts with the state of each file"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from _compile_job import ENCODING, content_hash
+
+
+class FileState:
+    MTIME_GRANULARITY_NS = 2_000_000_000
+    """Coarsest granularity of the modification time of the supported file systems (FAT) in nanoseconds"""
+
+    def __init__(self, mtime_ns: int, size: int, file_hash: str, content: Optional[str] = None,
+                 checked_ns: int = 0):
+        """
+        State of a file read by the compiler.
+
+        :param mtime_ns: Modification time in nanoseconds
+        :param size: File size in bytes
+        :param file_hash: Content hash of the file
+        :param content: Decoded content of the file or None if it's not kept in memory
+        :param checked_ns: Time in nanoseconds when the file has been read
+        """
+        self.mtime_ns: int = mtime_ns
+        self.size: int = size
+        self.file_hash: str = file_hash
+        self.content: Optional[str] = content
+        self.checked_ns: int = checked_ns
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """
+        Check if the file is unchanged. If the file has been read within the granularity of its modification time,
+        then it might have been changed afterward without a different modification time and size. In this case it's
+        treated as changed, so it's read and hashed again.
+
+        :param stat: Current state of the file
+        :return: True if the file has not been changed since the state has been taken, False otherwise
+        """
+        if self.checked_ns - self.mtime_ns < self.MTIME_GRANULARITY_NS:
+            return False
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+class ImportGraph:
+    FILE_NAME = "import_graph.json"
+    """Name of the file to persist the graph in the cache directory"""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Dependency graph between the compiled scripts and all files read while compiling them (e.g. imports).
+        Each file is tracked with modification time, size and content hash, so unchanged files are neither read nor
+        hashed again. The content of unchanged files which have been read while compiling the scripts is kept in memory,
+        so a long-lived compile server only reads the edited files.
+
+        :param cache_dir: Directory to persist the graph or None to keep it in memory only
+        """
+        self.file: Optional[Path] = cache_dir / self.FILE_NAME if cache_dir else None
+        """File to persist the graph"""
+        self.states: dict[str, FileState] = {}
+        """State of each file where the key is the resolved file path"""
+        self.imports: dict[str, set[str]] = {}
+        """Files read while compiling a script where the key is the path of the compiled script"""
+        self.load()
+
+    def load(self):
+        """
+        Load the persisted graph (if any).
+        """
+        if not self.file or not self.file.is_file():
+            return
+        try:
+            data = json.loads(self.file.read_text(encoding="utf-8"))
+            for path, (mtime_ns, size, file_hash, *checked_ns) in data["states"].items():
+                # Graphs persisted without the time of the check are hashed again
+                self.states[path] = FileState(mtime_ns, size, file_hash, checked_ns=checked_ns[0] if checked_ns else 0)
+            for path, imports in data["imports"].items():
+                self.imports[path] = set(imports)
+        except (OSError, ValueError, KeyError):
+            # A broken graph only costs re-reading the files
+            self.states = {}
+            self.imports = {}
+
+    def save(self):
+        """
+        Persist the graph (if a cache directory has been specified).
+        """
+        if not self.file:
+            return
+        data: dict[str, Any] = {
+            "states": {path: (state.mtime_ns, state.size, state.file_hash, state.checked_ns)
+                       for path, state in self.states.items()},
+            "imports": {path: sorted(imports) for path, imports in self.imports.items()}
+        }
+        tmp_file = self.file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_file.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_file, self.file)
+        except OSError:
+            tmp_file.unlink(missing_ok=True)
+
+    def read_file(self, file: str) -> str:
+        """
+        Read a file for the compiler. The file is only read from disk if it has been changed since the last read.
+
+        :param file: Path of the file to read
+        :return: Content of the file
+        """
+        path = Path(file).resolve().as_posix()
+        stat = os.stat(path)
+        state = self.states.get(path)
+        if state and state.content is not None and state.matches(stat):
+            return state.content
+        checked_ns = time.time_ns()
+        content = Path(path).read_bytes().decode(ENCODING)
+        self.states[path] = FileState(stat.st_mtime_ns, stat.st_size, content_hash(content), content, checked_ns)
+        return content
+
+    def file_hash(self, file: str) -> str:
+        """
+        Get the content hash of a file. The file is only hashed again if it has been changed since the last time.
+
+        :param file: Path of the file
+        :return: Content hash of the file
+        """
+        path = Path(file).resolve().as_posix()
+        state = self.states.get(path)
+        if state and state.matches(os.stat(path)):
+            return state.file_hash
+        self.read_file(path)
+        return self.states[path].file_hash
+
+    def set_imports(self, script: str, files: list[str]):
+        """
+        Set the files read while compiling a script.
+
+        :param script: Path of the compiled script
+        :param files: Paths of all files read while compiling the script
+        """
+        self.imports[Path(script).resolve().as_posix()] = {Path(file).resolve().as_posix() for file in files}
+        self.release_contents()
+
+    def release_contents(self):
+        """
+        Release the content of all files which are not read by any of the compiled scripts anymore, e.g. a removed
+        import. Only the hashes of these files are kept.
+        """
+        imported = set().union(*self.imports.values())
+        for path, state in self.states.items():
+            if path not in imported:
+                state.content = None
+
+    def dependents(self, file: str) -> set[str]:
+        """
+        Get all compiled scripts which read the file while compiling.
+
+        :param file: Path of the file, e.g. an imported file
+        :return: Paths of the scripts depending on the file
+        """
+        path = Path(file).resolve().as_posix()
+        return {script for script, imports in self.imports.items() if path in imports}
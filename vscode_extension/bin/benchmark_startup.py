@@ -0,0 +1,131 @@
+#############################################################################
+# This file is part of the vscode-ksp-compiler distribution
+# (https://github.com/moosefriend/vscode-ksp-compiler).
+#
+# Copyright (c) 2024 MooseFriend (https://github.com/moosefriend)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+"""Measure the startup time of the compiler wrapper with and without precompiled bytecode"""
+import argparse
+import compileall
+import os
+import py_compile
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BIN_DIR = Path(__file__).parent.resolve()
+"""Directory of the compiler wrapper"""
+SOURCE_DIRS = [BIN_DIR, BIN_DIR.parent / "sublime_ksp" / "compiler"]
+"""Directories which are precompiled by pre_build.py"""
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\S.*)$")
+"""Pattern of a line written by "python -X importtime" where group(2) is the cumulative time in µs and group(3) the
+module name (indented by the import depth)"""
+
+
+def remove_bytecode():
+    """
+    Remove the bytecode of all source directories, like after extracting a package without bytecode.
+    """
+    for source_dir in SOURCE_DIRS:
+        for cache_dir in source_dir.rglob("__pycache__"):
+            shutil.rmtree(cache_dir)
+
+
+def compile_bytecode(invalidation_mode: py_compile.PycInvalidationMode):
+    """
+    Compile the bytecode of all source directories.
+
+    :param invalidation_mode: CHECKED_HASH like pre_build.py or TIMESTAMP like the interpreter on the first start
+    """
+    for source_dir in SOURCE_DIRS:
+        if source_dir.is_dir():
+            compileall.compile_dir(source_dir, quiet=1, invalidation_mode=invalidation_mode)
+
+
+def run(args: list[str]) -> tuple[float, float]:
+    """
+    Start the interpreter once.
+
+    :param args: Arguments passed to the interpreter, e.g. the compiler wrapper and its options
+    :return: Tuple of the wall time and the total import time in seconds
+    """
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=BIN_DIR, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE, encoding="utf-8", errors="replace")
+    wall = time.perf_counter() - start
+    # The cumulative times of the top level imports sum up to the total import time
+    import_time = sum(int(m.group(2)) for line in process.stderr.splitlines()
+                      if (m := IMPORT_TIME_PATTERN.match(line)) and not m.group(3).startswith(" "))
+    return wall, import_time / 1e6
+
+
+def measure(name: str, args: list[str], runs: int, prepare=None):
+    """
+    Start the interpreter several times and print the median times.
+
+    :param name: Description of the scenario
+    :param args: Arguments passed to the interpreter
+    :param runs: Number of starts
+    :param prepare: Function called before each start or None
+    """
+    walls = []
+    import_times = []
+    for _ in range(runs):
+        if prepare:
+            prepare()
+        wall, import_time = run(args)
+        walls.append(wall)
+        import_times.append(import_time)
+    wall = statistics.median(walls) * 1000
+    import_time = statistics.median(import_times) * 1000
+    print(f"| {name:<44} | {wall:>8.1f} ms | {import_time:>8.1f} ms |")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the startup time of the compiler wrapper with and without "
+                                                 "precompiled bytecode. Note that the bytecode of the wrapper and the "
+                                                 "SublimeKSP compiler is removed and compiled again.")
+    parser.add_argument('-n', '--runs', type=int, default=20, help="Number of starts per scenario (default: 20)")
+    parser.add_argument('args', nargs='*', default=["--help"],
+                        help="Options passed to the compiler wrapper, e.g. -- --check-only script.ksp "
+                             "(default: --help, which doesn't need the SublimeKSP compiler)")
+    bench_args = parser.parse_args()
+    os.environ.pop("PYTHONDONTWRITEBYTECODE", None)
+    print(f"Python {sys.version.split()[0]} ({sys.implementation.cache_tag}), {bench_args.runs} starts of "
+          f"ksp_compiler_wrapper.py {' '.join(bench_args.args)}")
+    print(f"| {'Start':<44} | {'Wall':>11} | {'Imports':>11} |")
+    print(f"|{'-' * 46}|{'-' * 13}|{'-' * 13}|")
+    measure("Interpreter only: python -c pass", ["-c", "pass"], bench_args.runs)
+    wrapper_args = [str(BIN_DIR / "ksp_compiler_wrapper.py")] + bench_args.args
+    # Each start has to compile the modules, e.g. if the installation directory is read-only
+    measure("Cold: no bytecode", wrapper_args, bench_args.runs, remove_bytecode)
+    # The first start after the installation with the bytecode of pre_build.py
+    remove_bytecode()
+    compile_bytecode(py_compile.PycInvalidationMode.CHECKED_HASH)
+    measure("Warm: checked hash bytecode of pre_build.py", wrapper_args, bench_args.runs)
+    # The modules of all modes imported at once like before they have been imported on demand
+    measure("Warm: modules of all modes imported eagerly",
+            ["-c", "import ksp_compiler_wrapper, _compile_batch, _compile_server, _compile_cache"], bench_args.runs)
+    # Any later start without the bytecode of pre_build.py, because the first start has written the bytecode
+    remove_bytecode()
+    compile_bytecode(py_compile.PycInvalidationMode.TIMESTAMP)
+    measure("Warm: bytecode written by the first start", wrapper_args, bench_args.runs)
+    # Leave the bytecode as pre_build.py does
+    remove_bytecode()
+    compile_bytecode(py_compile.PycInvalidationMode.CHECKED_HASH)
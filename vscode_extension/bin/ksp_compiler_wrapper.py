@@ -16,30 +16,107 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 ##############################################################################
-import traceback
-import sys
+import time
 
-import _find_ksp_compiler  # noqa
-from ksp_compiler import main, ParseException
+# CPU time of the interpreter startup and wall clock before importing the compiler for --timings
+START_CPU = time.process_time()
+START_WALL = time.perf_counter()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+from pathlib import Path  # noqa: E402
+
+# Only the modules needed by every run are imported here, the modules for the batch mode, the compile server and
+# the cache are imported on demand to keep the startup time low
+
+from _compile_job import CompileJob  # noqa: E402
+
+IMPORT_CPU = time.process_time() - START_CPU
+IMPORT_WALL = time.perf_counter() - START_WALL
+
+
+def parse_wrapper_args(args: list[str]) -> tuple[argparse.Namespace, list[str]]:
+    """
+    Parse the options handled by the wrapper itself. All other options are passed to the compiler.
+
+    :param args: Command line arguments
+    :return: Tuple of the wrapper options and the remaining compiler options
+    """
+    parser = argparse.ArgumentParser(description="Wrapper for the SublimeKSP compiler", add_help=False)
+    parser.add_argument('--server', action='store_true',
+                        help="Run as long-lived compile server reading JSON requests from stdin (or --port)")
+    parser.add_argument('--host', default="127.0.0.1",
+                        help="Loopback host address for the compile server socket (other hosts are rejected)")
+    parser.add_argument('--port', type=int, help="Port for the compile server socket (0 for any free port)")
+    parser.add_argument('--json-diagnostics', dest='json_diagnostics', action='store_true',
+                        help="Write one JSON record per error or warning to stderr instead of the error framing")
+    parser.add_argument('--cache-dir', dest='cache_dir', type=Path,
+                        help="Directory to cache the compile results (the compile server also caches them in memory)")
+    parser.add_argument('--cache-size', dest='cache_size', type=int, default=64,
+                        help="Maximum size of the compile cache in MiB")
+    parser.add_argument('--batch', type=Path,
+                        help="Compile all files listed in this file, one \"<input> [==> <output>]\" per line")
+    parser.add_argument('--glob', help="Compile all files matching this glob pattern, e.g. \"**/*.ksp\"")
+    parser.add_argument('--output-dir', dest='output_dir', type=Path,
+                        help="Directory for the files compiled with --glob")
+    parser.add_argument('--jobs', type=int, default=0,
+                        help="Number of worker processes for --batch and --glob (default: number of CPUs)")
+    return parser.parse_known_args(args)
+
+
+def main() -> int:
+    """
+    Either compile a single script, compile many scripts or run the compile server.
+
+    :return: Exit code
+    """
+    wrapper_args, compiler_args = parse_wrapper_args(sys.argv[1:])
+    if wrapper_args.batch or wrapper_args.glob:
+        from _compile_batch import BatchCompiler
+        if wrapper_args.batch:
+            file_pairs = BatchCompiler.read_list_file(wrapper_args.batch)
+        else:
+            file_pairs = BatchCompiler.glob_files(wrapper_args.glob, wrapper_args.output_dir)
+        if wrapper_args.output_dir:
+            wrapper_args.output_dir.mkdir(parents=True, exist_ok=True)
+        batch = BatchCompiler(compiler_args, file_pairs, wrapper_args.jobs, wrapper_args.cache_dir,
+                              wrapper_args.cache_size * 1024 * 1024)
+        return batch.run(wrapper_args.json_diagnostics)
+    cache = None
+    if wrapper_args.server or wrapper_args.cache_dir:
+        from _compile_cache import CompileCache
+        cache = CompileCache(wrapper_args.cache_dir, wrapper_args.cache_size * 1024 * 1024)
+    if wrapper_args.server:
+        from _compile_server import CompileServer
+        server = CompileServer(cache)
+        if wrapper_args.port is None:
+            server.serve_stdio()
+        else:
+            try:
+                server.serve_socket(wrapper_args.host, wrapper_args.port)
+            except ValueError as ex:
+                print(f"*** Error: {ex}", file=sys.stderr)
+                return -1
+        return 0
+    # A single compile keeps the default signal handling, so SIGTERM of the extension stops it immediately
+    job = CompileJob(compiler_args, cache)
+    if job.timings:
+        # The wall time of the interpreter startup is unknown, because it's started before this script
+        job.timings.add("startup", None, START_CPU)
+        job.timings.add("imports", IMPORT_WALL, IMPORT_CPU)
+    result = job.run()
+    sys.stdout.write(result.stdout)
+    if result.timings:
+        sys.stdout.write(json.dumps({"timings": result.timings}, separators=(",", ":")) + "\n")
+    if wrapper_args.json_diagnostics:
+        # All records are written at once, so the extension gets them in a single chunk
+        sys.stderr.write(result.diagnostics_json())
+    else:
+        sys.stderr.write(result.error_text())
+    sys.stderr.flush()
+    return result.exit_code
 
 
 if __name__ == "__main__":
-    exit_code = 0
-    try:
-        main()
-    except ParseException as ex:
-        print(">>> BEGIN Error", file=sys.stderr)
-        message = ex.error_message
-        print(message, file=sys.stderr)
-        if ex.line:
-            print(f">>> Command: {ex.line.command}", file=sys.stderr)
-            print(f">>> Location: {ex.line.filename}: {ex.line.lineno}", file=sys.stderr)
-        print(">>> END Error", file=sys.stderr)
-        exit_code = 1
-    except Exception as ex:
-        print(">>> BEGIN Exception", file=sys.stderr)
-        message = traceback.format_exc()
-        print(message, file=sys.stderr)
-        print(">>> END Exception", file=sys.stderr)
-        exit_code = -1
-    sys.exit(exit_code)
\ No newline at end of file
+    sys.exit(main())
@@ -23,7 +23,7 @@ from pathlib import Path
 import _find_lib  # noqa
 from config.system_config import SystemConfig
 from util.format_util import headline
-from util.file_util import yml2json
+from util.file_util import compile_bytecode, yml2json
 from util.sublime_util import Sublime2TextMateConverter
 from vscode_generator.command_completion_generator import CommandCompletionGenerator
 from vscode_generator.command_name_generator import CommandNameGenerator
@@ -62,3 +62,6 @@ headline("Generate command completion as type script file")
 CommandCompletionGenerator.process()
 headline("Generate README.md")
 ReadmeGenerator.process()
+headline("Precompile the compiler wrapper and the SublimeKSP compiler")
+compile_bytecode(Path(__file__).parent)
+compile_bytecode(Path(__file__).parent.parent / "sublime_ksp" / "compiler")
@@ -39,11 +39,17 @@ export class CompileBuilder {
     public indent_size: number = 4;
     public add_compile_date: boolean = false;
     public sanitize_exit_command: boolean = false;
+    // Wrapper options
+    public json_diagnostics: boolean = true;
+    // Pass the document content via stdin instead of reading the input file
+    public source_from_stdin: boolean = false;
+    // Only check syntax and semantics without generating the compiled code
+    public check_only: boolean = false;
 
     /**
      * Commandline options initialized by configuration
      */
-    constructor(inputFile: string, outputFile: string) {
+    constructor(inputFile: string, outputFile?: string) {
         this.compiler_script = path.resolve(__dirname, '../../../bin/ksp_compiler_wrapper.py');
         this.inputFile = inputFile;
         this.outputFile = outputFile;
@@ -65,6 +71,9 @@ export class CompileBuilder {
     public build(): string[] {
         let args: string[] = []
         args.push(this.compiler_script);
+        if (this.json_diagnostics) {
+            args.push("--json-diagnostics");
+        }
         if (this.force) {
             args.push("--force");
         }
@@ -94,7 +103,18 @@ export class CompileBuilder {
         if (this.sanitize_exit_command) {
             args.push("--sanitize_exit_command");
         }
-        args.push(this.inputFile);
+        if (this.check_only) {
+            args.push("--check-only");
+        }
+        if (this.source_from_stdin) {
+            // The input file is only used for error locations and to resolve imports
+            args.push("--source-name");
+            args.push(this.inputFile);
+            args.push("-");
+        }
+        else {
+            args.push(this.inputFile);
+        }
         if (this.outputFile) {
             args.push(this.outputFile);
         }
@@ -48,6 +48,9 @@ export class CompileExecutor implements vscode.Disposable {
     private _onEnd: (() => void) | undefined;
     private _onExit: ((exitCode: number) => void) | undefined;
     private running: boolean = false;
+    // True if the running compilation has been started by the validation, so it may be cancelled by the next one
+    private isValidationRun: boolean = false;
+    private childProcess: child_process.ChildProcess | undefined;
     private tempFile: any;
     private _diagnosticCollection: vscode.DiagnosticCollection = vscode.languages.createDiagnosticCollection();
     private diagnostics: vscode.Diagnostic[] = [];
@@ -60,6 +63,7 @@ export class CompileExecutor implements vscode.Disposable {
     private errorType: string = "";
     private showStdOut: boolean = false;
     private showStdErr: boolean = false;
+    private jsonDiagnostics: boolean = false;
 
     private constructor() {
         this._delayer.defaultDelay = ConfigurationManager.getConfig<number>(config.KEY_VALIDATE_DELAY);
@@ -189,6 +193,10 @@ export class CompileExecutor implements vscode.Disposable {
      */
     private parseStdOut(lineText: string): void {
         this.addLine(lineText, Channel.StdOut)
+        // With JSON diagnostics the printed errors and warnings are also reported on stderr
+        if (this.jsonDiagnostics) {
+            return;
+        }
         let matches = lineText.match(REGEX_ERROR_MESSAGE);
         if (matches) {
             let level = matches[1];
@@ -220,6 +228,10 @@ export class CompileExecutor implements vscode.Disposable {
      */
     private parseStdErr(lineText: string): void {
         this.addLine(lineText, Channel.StdErr)
+        if (this.jsonDiagnostics && lineText.startsWith("{")) {
+            this.parseJsonDiagnostic(lineText);
+            return;
+        }
         let matches = lineText.match(REGEX_ERROR_BEGIN);
         if (matches) {
             this.errorParsing = true
@@ -251,6 +263,40 @@ export class CompileExecutor implements vscode.Disposable {
         }
     }
 
+    /**
+     * Parse a diagnostic record written by the compiler wrapper with --json-diagnostics, e.g.
+     * {"severity":"error","file":"x.ksp","line":3,"command":"...","type":"ParseException","message":"..."}
+     *
+     * @param lineText Line to parse
+     */
+    private parseJsonDiagnostic(lineText: string): void {
+        let record: any;
+        try {
+            record = JSON.parse(lineText);
+        }
+        catch (e) {
+            this.addLine("Invalid diagnostic: " + lineText, Channel.StdErr);
+            return;
+        }
+        this.errorMessage = record.message;
+        this.errorCommand = record.command;
+        this.errorFile = record.file;
+        this.errorLineNo = record.line;
+        if (record.severity === "warning") {
+            let diagnostic: vscode.Diagnostic = new vscode.Diagnostic(
+                new vscode.Range(this.errorLineNo - 1, 0, this.errorLineNo - 1, Number.MAX_VALUE),
+                this.errorMessage,
+                vscode.DiagnosticSeverity.Warning,
+            );
+            diagnostic.code = "KSP Compiler"
+            this.diagnostics.push(diagnostic);
+            return;
+        }
+        // Same handling as for the ">>> BEGIN Error" and ">>> BEGIN Exception" blocks
+        this.errorType = (record.type === "ParseException") ? "Error" : "Exception";
+        this.handleError();
+    }
+
     /**
      * Handle compiler errors
      */
@@ -288,7 +334,7 @@ export class CompileExecutor implements vscode.Disposable {
     /**
      * Execute KSP syntax parser program (async)
      */
-    private executeImpl(document: vscode.TextDocument, argBuilder: CompileBuilder, useDiagnostics: boolean = true): Promise<void> {
+    private executeImpl(document: vscode.TextDocument, argBuilder: CompileBuilder, useDiagnostics: boolean = true, isValidation: boolean = false): Promise<void> {
         return new Promise<void>((resolve, reject) => {
             if (!ConfigurationManager.getConfig<boolean>(config.KEY_VALIDATE_ENABLE)) {
                 vscode.window.showErrorMessage('KSP Compiler: Validate is disabled! See Preference of KSP.');
@@ -309,9 +355,12 @@ export class CompileExecutor implements vscode.Disposable {
                 let python = ConfigurationManager.getConfig<string>(config.KEY_PYTHON_LOCATION);
                 this.showStdOut = ConfigurationManager.getConfig<boolean>(config.KEY_SHOW_STDOUT);
                 this.showStdErr = ConfigurationManager.getConfig<boolean>(config.KEY_SHOW_STDERR);
+                this.jsonDiagnostics = argBuilder.json_diagnostics;
                 this.clearOutput();
                 this.addLine(`Executing: ${python} ${args.map(a => `"${a}"`).join(' ')}`, Channel.StdOut);
                 let childProcess = child_process.spawn(python, args, undefined);
+                this.childProcess = childProcess;
+                this.isValidationRun = isValidation;
                 childProcess.on('error', (error: Error) => {
                     this.removeTempfile();
                     this._diagnosticCollection.set(document.uri, undefined);
@@ -325,27 +374,50 @@ export class CompileExecutor implements vscode.Disposable {
                 if (childProcess.pid) {
                     this.running = true;
                     processFailed = false;
+                    // Pass the document content instead of the saved file
+                    if (argBuilder.source_from_stdin) {
+                        childProcess.stdin.on('error', (error: Error) => {
+                            this.addLine(`Can't write to stdin: ${error.message}`, Channel.StdErr);
+                        });
+                        childProcess.stdin.end(document.getText());
+                    }
+                    // A chunk might end within a line, so the incomplete last line is kept until the next chunk
+                    let stdoutRest: string = "";
+                    let stderrRest: string = "";
+                    childProcess.stdout.setEncoding('utf8');
+                    childProcess.stderr.setEncoding('utf8');
                     // Handling stdout
-                    childProcess.stdout.on('data', (data: Buffer) => {
+                    childProcess.stdout.on('data', (data: string) => {
+                        // Late output of a cancelled process must not be mixed into the diagnostics of the next run
+                        if (this.childProcess !== childProcess) {
+                            return;
+                        }
                         if (useDiagnostics) {
-                            data.toString().split(REGEX_PARSER_MESSAGE_NEWLINE).forEach(x => {
+                            let lines: string[] = (stdoutRest + data).split(REGEX_PARSER_MESSAGE_NEWLINE);
+                            stdoutRest = lines.pop() ?? "";
+                            lines.forEach(x => {
                                 this.parseStdOut(x);
                             });
                         }
                         if (this._onStdout) {
-                            this._onStdout(data.toString());
+                            this._onStdout(data);
                         }
                         resolve();
                     });
                     // Handling stderr
-                    childProcess.stderr.on('data', (data: Buffer) => {
+                    childProcess.stderr.on('data', (data: string) => {
+                        if (this.childProcess !== childProcess) {
+                            return;
+                        }
                         if (useDiagnostics) {
-                            data.toString().split(REGEX_PARSER_MESSAGE_NEWLINE).forEach(x => {
+                            let lines: string[] = (stderrRest + data).split(REGEX_PARSER_MESSAGE_NEWLINE);
+                            stderrRest = lines.pop() ?? "";
+                            lines.forEach(x => {
                                 this.parseStdErr(x);
                             });
                         }
                         if (this._onStderr) {
-                            this._onStderr(data.toString());
+                            this._onStderr(data);
                         }
                         resolve();
                     });
@@ -359,10 +431,22 @@ export class CompileExecutor implements vscode.Disposable {
                         }
                         resolve();
                     });
-                    // Process finished
-                    childProcess.stdout.on('end', () => {
-                        this.removeTempfile();
+                    // Process finished and stdout and stderr have been closed
+                    childProcess.on('close', () => {
                         if (useDiagnostics) {
+                            // Parse the last lines without a trailing newline
+                            if (stdoutRest) {
+                                this.parseStdOut(stdoutRest);
+                            }
+                            if (stderrRest) {
+                                this.parseStdErr(stderrRest);
+                            }
+                            stdoutRest = "";
+                            stderrRest = "";
+                        }
+                        this.removeTempfile();
+                        // The diagnostics of a cancelled compilation are incomplete
+                        if (useDiagnostics && !childProcess.killed) {
                             if (!document.isClosed) {
                                 this.DiagnosticCollection.set(document.uri, this.diagnostics);
                             }
@@ -373,7 +457,10 @@ export class CompileExecutor implements vscode.Disposable {
                         if (this._onEnd) {
                             this._onEnd();
                         }
-                        this.running = false;
+                        // A cancelled process might end after the next compilation has been started
+                        if (this.childProcess === childProcess) {
+                            this.running = false;
+                        }
                         resolve();
                     });
                 }
@@ -407,16 +494,37 @@ export class CompileExecutor implements vscode.Disposable {
         });
     }
 
+    /**
+     * Cancel the running compilation. The compiler wrapper stops at the next phase boundary of the compiler.
+     */
+    public cancel(): void {
+        if (this.running && this.childProcess && this.childProcess.exitCode === null) {
+            this.addLine("Cancelling outdated compilation", Channel.StdOut);
+            this.childProcess.kill('SIGTERM');
+        }
+        this.running = false;
+    }
+
     /**
      * Execute KSP syntax parser program
+     *
+     * @param isValidation True if called by the validation, so the compilation is cancelled by the next validation
      */
-    public execute(document: vscode.TextDocument, argBuilder: CompileBuilder, preSave: Boolean = true, useDiagnostics: boolean = true): void {
+    public execute(document: vscode.TextDocument, argBuilder: CompileBuilder, preSave: Boolean = true, useDiagnostics: boolean = true, isValidation: boolean = false): void {
         if (document.languageId !== "ksp") {
             return;
         }
-        if (this.running || document.isClosed) {
+        if (document.isClosed) {
             return;
         }
+        if (this.running) {
+            // A compilation started by the user is never interrupted, e.g. while it writes the output file
+            if (!this.isValidationRun) {
+                return;
+            }
+            // The running validation is outdated, because the document has been changed meanwhile
+            this.cancel();
+        }
         // Wait until the document has not been changed for a ceratin time before starting the compiler
         // => Always use the delayer for compilation
         this._delayer.trigger(async () => {
@@ -424,13 +532,13 @@ export class CompileExecutor implements vscode.Disposable {
                 this.isProgrammaticSave = true;
                 const fulfilled = await document.save();
                 if (fulfilled) {
-                    await this.executeImpl(document, argBuilder, useDiagnostics);
+                    await this.executeImpl(document, argBuilder, useDiagnostics, isValidation);
                 } else {
                     this.isProgrammaticSave = false;
                 }
                 return;
             }
-            await this.executeImpl(document, argBuilder, useDiagnostics);
+            await this.executeImpl(document, argBuilder, useDiagnostics, isValidation);
         });
     }
 }
\ No newline at end of file
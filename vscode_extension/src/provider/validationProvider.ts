@@ -24,7 +24,6 @@ import { ConfigurationManager } from '../config/configurationManager';
 import { CompileExecutor } from '../compiler/compileExecutor';
 import { CompileBuilder } from '../compiler/compileBuilder';
 import { Channel } from '../compiler/commandSetup';
-import * as tmp from 'tmp';
 
 export class ValidationProvider {
     private validationEnabled: boolean = ConfigurationManager.getConfig<boolean>(config.KEY_VALIDATE_ENABLE);
@@ -149,8 +148,11 @@ export class ValidationProvider {
             return;
         }
         let src: string = textDocument.fileName;
-        let tmpFile = tmp.fileSync();
-        let argBuilder: CompileBuilder = new CompileBuilder(src, tmpFile.name);
+        // Validate the document content passed via stdin, so neither a save nor an output file is needed
+        let argBuilder: CompileBuilder = new CompileBuilder(src);
+        argBuilder.source_from_stdin = true;
+        // Only the validation while typing skips the code generation, on save the script is compiled completely
+        argBuilder.check_only = this.realtimeTrigger;
         let delayer: ThrottledDelayer<void> = compiler.Delayer;
         let delay = this.realtimeTrigger ? this.realtimeValidationDelay : 0;
         if (this.realtimeValidationEnabled) {
@@ -163,6 +165,6 @@ export class ValidationProvider {
             }
             this.pauseValidation = true;
         };
-        compiler.execute(textDocument, argBuilder);
+        compiler.execute(textDocument, argBuilder, false, true, true);
     }
 }